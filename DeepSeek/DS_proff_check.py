@@ -1,15 +1,22 @@
 # Please install OpenAI SDK first: `pip3 install openai`
-import os
-from openai import OpenAI
 from config.config import load_config
+from DeepSeek.client import DeepSeekClient
 import asyncio
+import json
 from logging import getLogger
 logger = getLogger(__name__)
 config = load_config()
 api = config.deepseek.api_key
-semaphore = asyncio.Semaphore(1)
 
-client = OpenAI(api_key=api, base_url="https://api.deepseek.com")
+# Общий асинхронный клиент: пул соединений, лимиты параллельности и частоты
+client = DeepSeekClient(
+    api_key=api,
+    base_url="https://api.deepseek.com",
+    max_concurrency=config.deepseek.max_concurrency,
+    requests_per_second=config.deepseek.requests_per_second,
+    tokens_per_minute=config.deepseek.tokens_per_minute,
+    timeout=config.deepseek.timeout,
+)
 
 system = """
 Ты — интеллектуальный фильтр и классификатор вакансий для автоматической системы. Твоя задача — анализировать текстовые сообщения и выдавать бинарный результат для каждой пары: профессия кандидата и вакансия.
@@ -47,29 +54,106 @@ system = """
 """
 
 async def ai_proff_check(text: str, proff: str) -> str:
-    async with semaphore: 
-        try:
-            def run_sync():
-                response = client.chat.completions.create(
-                    model="deepseek-chat",
-                    messages=[
-                        {"role": "system", "content": system},
-                        {"role": "user", "content": f"Сообщение: {text}\nПрофессия: {proff}"},
-                    ],
-                    stream=False
-                )
-                return response.choices[0].message.content
-
-            # 🕓 ограничим время ожидания, чтобы бот не завис навсегда
-            result = await asyncio.wait_for(asyncio.to_thread(run_sync), timeout=30)
-
-            logger.info(f"✅ AI проверка профессии '{proff}' завершена: {result}")
-            return result
-
-        except asyncio.TimeoutError:
-            logger.error(f"⏱ Тайм-аут при проверке профессии '{proff}'")
-            return "0"
-
-        except Exception as e:
-            logger.error(f"❌ Ошибка при вызове DeepSeek API: {e}")
-            return "0"
\ No newline at end of file
+    return await _ai_proff_check(text, proff) or "0"
+
+
+async def _ai_proff_check(text: str, proff: str) -> str | None:
+    """Как ai_proff_check, но при ошибке или тайм-ауте возвращает None вместо "0"."""
+    try:
+        # 🕓 дедлайн клиента ограничивает и ожидание в очереди, и сам запрос
+        result = await client.chat(
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": f"Сообщение: {text}\nПрофессия: {proff}"},
+            ],
+            max_tokens=4,
+        )
+
+        logger.info(f"✅ AI проверка профессии '{proff}' завершена: {result}")
+        return result
+
+    except asyncio.TimeoutError:
+        logger.error(f"⏱ Тайм-аут при проверке профессии '{proff}'")
+        return None
+
+    except Exception as e:
+        logger.error(f"❌ Ошибка при вызове DeepSeek API: {e}")
+        return None
+
+
+system_batch = system + """
+
+Пакетный режим:
+
+Иногда вместо одной профессии приходит пронумерованный список профессий.
+Тогда правила 1–3 применяются к каждой профессии отдельно, а ответ —
+**только JSON-объект** вида {"1": 1, "2": 0}, где ключ — номер профессии
+из списка, а значение — 0 или 1. Ключи должны быть у всех профессий списка.
+Если сообщение не является вакансией, у всех профессий значение 0.
+"""
+
+
+def parse_batch_verdict(content: str, proffs: list[str]) -> dict[str, str] | None:
+    """Разбирает JSON-ответ пакетной проверки; None, если ответ неполный или битый."""
+    try:
+        data = json.loads(content)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(data, dict):
+        return None
+
+    result = {}
+    for number, proff in enumerate(proffs, start=1):
+        value = data.get(str(number))
+        if value not in (0, 1, "0", "1"):
+            return None
+        result[proff] = str(value)
+    return result
+
+
+async def ai_proff_check_batch(text: str, proffs: list[str]) -> dict[str, str]:
+    """
+    Проверяет вакансию сразу по всем профессиям-кандидатам одним запросом.
+    Возвращает {профессия: "0" | "1"}. Если ответ пришёл, но не разобрался,
+    откатывается на поштучные вызовы. Если сам вызов не удался (ошибка,
+    тайм-аут) — возвращает {}: повторять его по каждой профессии бессмысленно.
+    """
+    if len(proffs) == 1:
+        return await _check_each(text, proffs)
+
+    proff_list = "\n".join(f"{number}. {proff}" for number, proff in enumerate(proffs, start=1))
+    try:
+        content = await client.chat(
+            messages=[
+                {"role": "system", "content": system_batch},
+                {"role": "user", "content": f"Сообщение: {text}\nПрофессии:\n{proff_list}"},
+            ],
+            response_format={"type": "json_object"},
+            # ответ — короткий JSON, длинная генерация не нужна
+            max_tokens=16 + 8 * len(proffs),
+        )
+
+    except asyncio.TimeoutError:
+        logger.error(f"⏱ Тайм-аут при пакетной проверке профессий {proffs}")
+        return {}
+
+    except Exception as e:
+        logger.error(f"❌ Ошибка при пакетном вызове DeepSeek API: {e}")
+        return {}
+
+    result = parse_batch_verdict(content, proffs)
+    if result is not None:
+        logger.info(f"✅ AI пакетная проверка профессий завершена: {result}")
+        return result
+
+    logger.warning(f"⚠️ Не удалось разобрать пакетный ответ DeepSeek: {content!r}, проверяем по одной")
+    return await _check_each(text, proffs)
+
+
+async def _check_each(text: str, proffs: list[str]) -> dict[str, str]:
+    result = {}
+    for proff in proffs:
+        verdict = await _ai_proff_check(text, proff)
+        if verdict is not None:
+            result[proff] = verdict
+    return result
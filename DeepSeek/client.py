@@ -0,0 +1,111 @@
+import asyncio
+from logging import getLogger
+
+import httpx
+from openai import AsyncOpenAI
+
+from utils.token_bucket import TokenBucket
+
+logger = getLogger(__name__)
+
+
+class DeepSeekClient:
+    """
+    Асинхронный клиент DeepSeek: общий keep-alive пул соединений,
+    ограничение одновременных запросов, token bucket на запросы в секунду
+    и токены в минуту, дедлайн на каждый вызов (с учётом ожидания в очереди).
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://api.deepseek.com",
+        max_concurrency: int = 4,
+        requests_per_second: float = 5.0,
+        tokens_per_minute: float = 0,
+        timeout: float = 30,
+    ) -> None:
+        self.timeout = timeout
+        self._client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=0,  # повторы решаем сами, очередь не должна зависать на ретраях SDK
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=max_concurrency,
+                    max_keepalive_connections=max_concurrency,
+                    keepalive_expiry=60,
+                ),
+                timeout=timeout,
+            ),
+        )
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._requests = TokenBucket(requests_per_second, max(1.0, requests_per_second))
+        self._tokens = TokenBucket(tokens_per_minute / 60, tokens_per_minute)
+
+        self.queued = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+
+    @staticmethod
+    def estimate_tokens(messages: list[dict], max_tokens: int | None) -> int:
+        # ~3 символа на токен для смешанного русского/английского текста
+        prompt = sum(len(m.get("content", "")) for m in messages) // 3
+        return prompt + (max_tokens or 256)
+
+    async def chat(
+        self,
+        messages: list[dict],
+        max_tokens: int | None = None,
+        response_format: dict | None = None,
+        timeout: float | None = None,
+    ) -> str:
+        """Возвращает текст ответа. asyncio.TimeoutError — если не уложились в дедлайн."""
+        async with asyncio.timeout(timeout or self.timeout):
+            estimate = self.estimate_tokens(messages, max_tokens)
+
+            self.queued += 1
+            try:
+                await self._semaphore.acquire()
+            finally:
+                self.queued -= 1
+
+            try:
+                await self._requests.acquire()
+                await self._tokens.acquire(estimate)
+
+                self.in_flight += 1
+                try:
+                    kwargs = {}
+                    if max_tokens:
+                        kwargs["max_tokens"] = max_tokens
+                    if response_format:
+                        kwargs["response_format"] = response_format
+                    response = await self._client.chat.completions.create(
+                        model="deepseek-chat",
+                        messages=messages,
+                        stream=False,
+                        **kwargs,
+                    )
+                except BaseException:
+                    self.failed += 1
+                    raise
+                finally:
+                    self.in_flight -= 1
+            finally:
+                self._semaphore.release()
+
+        usage = getattr(response, "usage", None)
+        if usage is not None and usage.total_tokens > estimate:
+            self._tokens.consume(usage.total_tokens - estimate)
+        self.completed += 1
+        return response.choices[0].message.content
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "queued": self.queued,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
@@ -37,11 +37,11 @@ from db.requests import (
     get_profession_by_id,
     add_keyword_to_profession,
     db_delete_keyword,
-    load_stopwords,
     db_add_profession,
     db_delete_profession,
     db_add_profession_desc,
     db_delete_profession_desc,
+    db_set_profession_gate,
     db_add_stopword,
     db_delete_stopword,
     get_all_stopwords,
@@ -56,13 +56,24 @@ from db.requests import (
     save_in_trash,
     get_all_user_info,
     get_all_support_users,
+    db_set_chat_filter,
+    db_delete_chat_filter,
 )
 from db.crud import (
     get_upcoming_mailings,
     cancel_admin_mailings,
 )
 
-from find_job_process.find_job import load_professions
+from find_job_process.find_job import embedding_cache
+from find_job_process.classifier_config import CHAT_FILTER_REASON, publish_classifier_update
+from DeepSeek.DS_proff_check import client as deepseek_client
+from find_job_process.verdict_cache import verdict_cache
+from find_job_process.distilled import distilled_classifier
+from find_job_process.gating import gating_policy
+from parser.tg_worker import vacancy_pipeline
+from parser.entity_cache import entity_cache
+from parser.rate_governor import rate_governor
+from parser.prefilter import ingest_filter
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from bot.lexicon.lexicon import LEXICON_PARSER, LEXICON_ADMIN
@@ -346,7 +357,7 @@ async def process_new_keyword(
             f"Failed to add keyword '{new_keyword}' to profession ID {profession_id}"
         )
 
-    await load_professions()
+    await publish_classifier_update("add_keyword")
 
 
 @router.callback_query(IsAdminFilter(), F.data == "back_to_proffs")
@@ -404,7 +415,7 @@ async def process_delete_keyword(
             reply_markup=await choosen_prof_keyboard(profession_id),
         )
 
-    await load_professions()
+    await publish_classifier_update("delete_keyword")
     await close_clock(callback)
 
 
@@ -482,7 +493,7 @@ async def process_new_profession_desc(
         )
         logger.error(f"Failed to add profession '{new_profession}'")
 
-    await load_professions()
+    await publish_classifier_update("add_profession")
 
 
 @router.callback_query(IsAdminFilter(), F.data == "delete_proff")
@@ -502,7 +513,7 @@ async def delete_profession(
         await callback.message.edit_text(
             LEXICON_PARSER["parser_main_after_delete_profession_err"]
         )
-    await load_professions()
+    await publish_classifier_update("delete_profession")
     await close_clock(callback)
 
 
@@ -539,7 +550,7 @@ async def delete_profession_desc(
             ),
             reply_markup=await choosen_prof_keyboard(profession_id),
         )
-    await load_professions()
+    await publish_classifier_update("delete_profession_desc")
     await close_clock(callback)
 
 
@@ -605,7 +616,95 @@ async def process_new_profession_desc_additional(
         )
         logger.error(f"Failed to update description for profession ID {profession_id}")
 
-    await load_professions()
+    await publish_classifier_update("add_profession_desc")
+
+
+def format_score(value: float | None) -> str:
+    return "не задано" if value is None else f"{value:g}"
+
+
+def parse_gate_bounds(text: str) -> tuple[float | None, float | None] | None:
+    """«4.5 1.6» -> (4.5, 1.6); «-» вместо числа — None. None, если формат неверный."""
+    parts = (text or "").replace(",", ".").split()
+    if len(parts) != 2:
+        return None
+    try:
+        accept, reject = (None if part == "-" else float(part) for part in parts)
+    except ValueError:
+        return None
+    if accept is not None and reject is not None and accept <= reject:
+        return None
+    return accept, reject
+
+
+@router.callback_query(IsAdminFilter(), F.data == "set_proffs_gate")
+async def set_profession_gate(callback: CallbackQuery, state: FSMContext):
+    data = await state.get_data()
+    profession_id = data.get("profession_id")
+
+    if not profession_id:
+        await callback.message.edit_text("Ошибка: не удалось получить ID профессии.")
+        return
+
+    profession = await get_profession_by_id(profession_id)
+    accept_score, reject_score = gating_policy.bands(profession.name)
+    await callback.message.edit_text(
+        LEXICON_PARSER["set_profession_gate_prompt"].format(
+            profession_name=profession.name,
+            accept_score=format_score(accept_score),
+            reject_score=format_score(reject_score),
+            **gating_policy.stats(profession.name),
+        ),
+        reply_markup=back_to_choosen_prof_kb,
+    )
+    await state.set_state(Prof.setting_gate)
+    await close_clock(callback)
+
+
+@router.message(Prof.setting_gate, IsAdminFilter())
+async def process_profession_gate(
+    message: Message, state: FSMContext, session: AsyncSession
+):
+    data = await state.get_data()
+    profession_id = data.get("profession_id")
+
+    if not profession_id:
+        await message.answer("Ошибка: не удалось получить ID профессии.")
+        return
+
+    bounds = parse_gate_bounds(message.text)
+    if bounds is None:
+        await message.answer(
+            LEXICON_PARSER["profession_gate_err"], reply_markup=back_to_choosen_prof_kb
+        )
+        return
+
+    accept_score, reject_score = bounds
+    success = await db_set_profession_gate(
+        session=session,
+        profession_id=profession_id,
+        accept_score=accept_score,
+        reject_score=reject_score,
+    )
+    if not success:
+        await message.answer("Ошибка: профессия не найдена.")
+        return
+
+    await state.set_state(Prof.main)
+    await publish_classifier_update("set_profession_gate")
+
+    profession = await get_profession_by_id(profession_id)
+    await message.answer(
+        LEXICON_PARSER["profession_gate_saved"].format(
+            profession_name=profession.name,
+            accept_score=format_score(accept_score),
+            reject_score=format_score(reject_score),
+        ),
+        reply_markup=await choosen_prof_keyboard(profession_id),
+    )
+    logger.info(
+        f"Updated score bands for profession ID {profession_id}: {accept_score}/{reject_score}"
+    )
 
 
 @router.callback_query(IsAdminFilter(), F.data == "back_to_choosen_prof")
@@ -672,7 +771,7 @@ async def process_adding_stopwords(
         )
         logger.error(f"Failed to add stop-word '{stopword}'")
 
-    await load_stopwords()
+    await publish_classifier_update("add_stopword")
     await state.set_state(Prof.main)
 
 
@@ -705,7 +804,7 @@ async def process_delete_stopword(
         await callback.message.edit_text("Ошибка при удалении стоп-слова.")
         logger.error(f"Failed to delete stop-word ID {stopword_id}")
 
-    await load_stopwords()
+    await publish_classifier_update("delete_stopword")
 
 
 @router.callback_query(IsAdminFilter(), F.data.startswith("delete_vacancy_"))
@@ -939,6 +1038,59 @@ async def show_stats(callback: CallbackQuery):
     text = "Перед вами статистика вакансий:\n\n"
     for key, value in raw_text.items():
         text += f"<b>{key}:</b> {value}\n"
+    cache_stats = embedding_cache.stats()
+    text += (
+        "\n<b>Кэш эмбеддингов:</b> "
+        f"попаданий {cache_stats['hits']} (с диска {cache_stats['disk_hits']}), "
+        f"промахов {cache_stats['misses']}, склеено {cache_stats['coalesced']}\n"
+    )
+    llm_stats = deepseek_client.stats()
+    text += (
+        "<b>DeepSeek:</b> "
+        f"в очереди {llm_stats['queued']}, выполняется {llm_stats['in_flight']}, "
+        f"готово {llm_stats['completed']}, ошибок {llm_stats['failed']}\n"
+    )
+    verdict_stats = verdict_cache.stats()
+    text += (
+        "<b>Кэш решений DeepSeek:</b> "
+        f"попаданий {verdict_stats['hits']} (из NATS {verdict_stats['kv_hits']}), "
+        f"промахов {verdict_stats['misses']}, в памяти {verdict_stats['size']}\n"
+    )
+    local_stats = distilled_classifier.stats()
+    text += (
+        f"<b>Локальная модель</b> ({local_stats['professions']} профессий): "
+        f"приняла {local_stats['accepted']}, отклонила {local_stats['rejected']}, "
+        f"передала DeepSeek {local_stats['deferred']}\n"
+    )
+    gate_stats = gating_policy.stats()
+    text += (
+        "<b>Границы оценки:</b> "
+        f"принято {gate_stats['accept']}, отклонено {gate_stats['reject']}, "
+        f"передано дальше {gate_stats['llm']}\n"
+    )
+    pipeline_stats = vacancy_pipeline.stats()
+    text += (
+        f"<b>Конвейер вакансий:</b> в работе {pipeline_stats['in_flight']}, "
+        f"опубликовано {pipeline_stats.get('publish_done', 0)}, "
+        f"ошибок {sum(v for k, v in pipeline_stats.items() if k.endswith('_failed'))}\n"
+    )
+    entity_stats = entity_cache.stats()
+    text += (
+        f"<b>Кэш сущностей Telegram</b> ({entity_stats['size']}): "
+        f"попаданий {entity_stats['hits']}, запросов {entity_stats['misses']}, "
+        f"неразрешимых {entity_stats['negative']}, объединено {entity_stats['coalesced']}\n"
+    )
+    prefilter_stats = ingest_filter.stats()
+    text += (
+        f"<b>Предфильтр юзербота:</b> в очередь {prefilter_stats['passed']}, отброшено: "
+        f"чат {prefilter_stats['chat']}, короткие {prefilter_stats['length']}, "
+        f"стоп-слова {prefilter_stats['stopword']}, известные {prefilter_stats['known']}\n"
+    )
+    for action, limits in rate_governor.stats().items():
+        text += (
+            f"<b>Telegram {action}:</b> {limits['rate']}/с, "
+            f"запросов {limits['calls']}, FloodWait {limits['flood_waits']}\n"
+        )
     await callback.message.edit_text(text, reply_markup=back_to_admin_main_kb)
     await callback.answer()
 
@@ -1005,6 +1157,27 @@ async def admin_get_user_info(message: Message):
         logger.error("Failed to get user info: %s", e)
         
         
+@router.message(Command("chatfilter"), IsAdminFilter())
+async def admin_chat_filter(message: Message):
+    args = message.text.split()  # /chatfilter allow|deny|remove chat_id
+    if len(args) < 3 or args[1] not in ("allow", "deny", "remove"):
+        await message.reply("Использование: /chatfilter allow|deny|remove chat_id")
+        return
+
+    try:
+        chat_id = int(args[2])
+    except ValueError:
+        await message.reply("chat_id должен быть числом")
+        return
+
+    if args[1] == "remove":
+        await db_delete_chat_filter(chat_id)
+    else:
+        await db_set_chat_filter(chat_id, args[1])
+    await publish_classifier_update(CHAT_FILTER_REASON)
+    await message.answer(f"Предфильтр: чат {chat_id} — {args[1]}")
+        
+        
 @router.message(Command("send"), IsAdminFilter())
 async def send_to_client_start(message: Message, state: FSMContext):
     args = message.text.split()  # получаем аргументы команды
@@ -34,6 +34,9 @@ from_admin_add_proffs_desc = InlineKeyboardButton(
 from_admin_delete_proffs_desc = InlineKeyboardButton(
     text="Удалить описание у профессии", callback_data="delete_proffs_desc"
 )
+from_admin_set_proffs_gate = InlineKeyboardButton(
+    text="Границы оценки без DeepSeek", callback_data="set_proffs_gate"
+)
 from_admin_add_keyword = InlineKeyboardButton(
     text="Добавить ключевое слово", callback_data="add_keyword"
 )
@@ -254,6 +257,7 @@ async def choosen_prof_keyboard(profession_id: int) -> InlineKeyboardMarkup:
         builder.row(from_admin_delete_proffs_desc)
     else:
         builder.row(from_admin_add_proffs_desc)
+    builder.row(from_admin_set_proffs_gate)
     builder.row(from_admin_delete_proff)
     builder.row(back_to_proffs_kb_button)
     return builder.as_markup()
@@ -223,6 +223,23 @@ LEXICON_PARSER = {
     "add_stopword_prompt": (
         "Пожалуйста, введите стоп-слово (выражение) для добавления:"
     ),
+    "set_profession_gate_prompt": (
+        "<b>Границы оценки для профессии</b> '{profession_name}'\n\n"
+        "Принимать без DeepSeek от: {accept_score}\n"
+        "Отклонять без DeepSeek ниже: {reject_score}\n\n"
+        "Обработано: принято {accept}, отклонено {reject}, передано DeepSeek {llm}\n\n"
+        "Введите две границы через пробел (принимать от, отклонять ниже), "
+        "например: <code>4.5 1.6</code>. Знак «-» — взять значение из конфига."
+    ),
+    "profession_gate_saved": (
+        "Границы оценки для профессии '{profession_name}' сохранены: "
+        "принимать от {accept_score}, отклонять ниже {reject_score}."
+    ),
+    "profession_gate_err": (
+        "Не удалось разобрать границы. Введите два числа через пробел, "
+        "например: <code>4.5 1.6</code>, или «-» вместо числа. "
+        "Граница принятия должна быть больше границы отклонения."
+    ),
     "vacancy_data": (
         "<b>Профессия:</b> {profession_name}\n"
         "<b>ID вакансии:</b> {vacancy_id}\n"
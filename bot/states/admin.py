@@ -8,6 +8,7 @@ class Prof(StatesGroup):
     add_keyword = State()
     add_profession = State()
     adding_stopwords = State()
+    setting_gate = State()
     
 
 class Admin(StatesGroup):
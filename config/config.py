@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from functools import lru_cache
 from environs import Env
 
 
@@ -41,6 +42,19 @@ class LogSettings:
 @dataclass
 class DeepSeek:
     api_key: str
+    max_concurrency: int = 4  # Одновременных запросов к API
+    requests_per_second: float = 5.0  # Лимит запросов в секунду (0 — без лимита)
+    tokens_per_minute: float = 0  # Лимит токенов в минуту (0 — без лимита)
+    timeout: float = 30  # Дедлайн одного вызова, секунд
+    verdict_ttl_hours: float = 72  # Сколько хранить решения DeepSeek по паре текст/профессия
+    verdict_cache_size: int = 20000  # Решений в памяти процесса
+    local_confidence: float = 0.95  # С какой уверенности локальная модель решает без DeepSeek
+    local_min_samples: int = 60  # Минимум примеров профессии для обучения локальной модели
+    local_retrain_hours: float = 6  # Как часто переобучать локальную модель
+    local_train_days: int = 60  # За сколько дней брать примеры
+    local_model_dir: str = "cache/distilled"
+    gate_accept_score: float | None = None  # Оценка, с которой профессия принимается без DeepSeek
+    gate_reject_score: float | None = None  # Оценка, ниже которой профессия отклоняется без DeepSeek
 
 
 @dataclass
@@ -48,8 +62,20 @@ class ParserSettings:
     api_id: int
     api_hash: str
     phone_number: str
-    delay_min: int
-    delay_max: int
+    near_dup_days: int = 3  # Сколько дней помним решения для почти-дубликатов
+    near_dup_threshold: float = 0.8  # Оценка сходства Жаккара для почти-дубликата
+    seen_hashes_capacity: int = 1_000_000  # Размер фильтра Блума хэшей вакансий и корзины
+    stop_embedding_threshold: float = 0.55  # Сходство с рекламой/резюме/скамом для отсева (1 — отключить)
+    entity_cache_ttl: int = 3600  # Сколько помним отправителей и чаты Telegram, секунд
+    entity_negative_ttl: int = 300  # Сколько помним неразрешимые id, секунд
+    entity_cache_size: int = 5000  # Сущностей Telegram в LRU
+    forward_rps: float = 1.0  # Запросов forward_messages в секунду
+    get_messages_rps: float = 3.0  # Запросов get_messages в секунду
+    get_entity_rps: float = 3.0  # Запросов get_entity/get_input_entity в секунду
+    flood_max_wait: int = 60  # FloodWait длиннее этого не пережидаем, секунд
+    prefilter_min_length: int = 0  # Сообщения короче не публикуются в очередь (0 — только пустые)
+    prefilter_stopwords: bool = True  # Отсев по стоп-словам ещё в юзерботе
+    prefilter_hashes: bool = True  # Отсев уже известных текстов ещё в юзерботе
 
 
 @dataclass
@@ -63,6 +89,33 @@ class GetcourseSettings:
 @dataclass
 class NatsSettings:
     servers: list[str]
+    vacancy_dedup_window: int = 7200  # Окно дедупликации Nats-Msg-Id для vacancy.queue, секунд
+    hh_dedup_window: int = 86400  # То же для hh.vacancy.queue (HH перезапрашивается каждые 8 часов)
+
+
+@dataclass
+class InferenceSettings:
+    model_name: str = "paraphrase-multilingual-MiniLM-L12-v2"
+    backend: str = "torch"  # torch | onnx | onnx-int8
+    onnx_file: str = ""  # Свой ONNX-файл из репозитория модели (по умолчанию — по бэкенду)
+    threads: int = 1  # Потоки, выполняющие encode вне event loop
+    batch_size: int = 32  # Максимум текстов в одном микро-батче
+    max_wait_ms: int = 5  # Сколько ждать остальные запросы батча
+    cache_dir: str = "cache/embeddings"  # Дисковый кэш эмбеддингов вакансий
+    cache_size: int = 10000  # Эмбеддингов в LRU в памяти
+    cache_disk_size: int = 100000  # Эмбеддингов в кольцевом буфере на диске
+    snapshot_dir: str = "cache/professions"  # Снимок эмбеддингов описаний профессий
+
+
+@dataclass
+class PipelineSettings:
+    fetch_batch: int = 16  # Сообщений JetStream за один fetch
+    max_in_flight: int = 64  # Сообщений в конвейере одновременно (остальные ждут в очереди NATS)
+    decode_concurrency: int = 4  # Параллельных задач стадии проверки хэшей
+    classify_concurrency: int = 8  # ... стадии фильтров и эмбеддингов
+    llm_concurrency: int = 8  # ... стадии DeepSeek (лимиты держит DeepSeekClient)
+    publish_concurrency: int = 2  # ... стадии форварда, сохранения и рассылки
+    heartbeat_seconds: float = 10  # Как часто продлевать ack_wait сообщений в работе
 
 
 @dataclass
@@ -76,9 +129,14 @@ class Config:
     nats: NatsSettings
     deepseek: DeepSeek
     google: Google
+    inference: InferenceSettings
+    pipeline: PipelineSettings
 
 
+@lru_cache(maxsize=None)
 def load_config(path: str | None = None) -> Config:
+    # .env разбирается один раз на процесс: модули, вызывающие load_config()
+    # при импорте, получают один и тот же объект
     env = Env()
     env.read_env(path)
     return Config(
@@ -103,8 +161,20 @@ def load_config(path: str | None = None) -> Config:
             api_id=env.int("API_ID"),
             api_hash=env("API_HASH"),
             phone_number=env("PHONE_NUMBER"),
-            delay_min=env.int("DELAY_MIN"),
-            delay_max=env.int("DELAY_MAX"),
+            near_dup_days=env.int("NEAR_DUP_DAYS", 3),
+            near_dup_threshold=env.float("NEAR_DUP_THRESHOLD", 0.8),
+            seen_hashes_capacity=env.int("SEEN_HASHES_CAPACITY", 1_000_000),
+            stop_embedding_threshold=env.float("STOP_EMBEDDING_THRESHOLD", 0.55),
+            entity_cache_ttl=env.int("ENTITY_CACHE_TTL", 3600),
+            entity_negative_ttl=env.int("ENTITY_NEGATIVE_TTL", 300),
+            entity_cache_size=env.int("ENTITY_CACHE_SIZE", 5000),
+            forward_rps=env.float("TG_FORWARD_RPS", 1.0),
+            get_messages_rps=env.float("TG_GET_MESSAGES_RPS", 3.0),
+            get_entity_rps=env.float("TG_GET_ENTITY_RPS", 3.0),
+            flood_max_wait=env.int("TG_FLOOD_MAX_WAIT", 60),
+            prefilter_min_length=env.int("PREFILTER_MIN_LENGTH", 0),
+            prefilter_stopwords=env.bool("PREFILTER_STOPWORDS", True),
+            prefilter_hashes=env.bool("PREFILTER_HASHES", True),
         ),
         database=DatabaseSettings(
             url=env("DATABASE_URL"),
@@ -118,11 +188,47 @@ def load_config(path: str | None = None) -> Config:
         ),
         nats=NatsSettings(
             servers=env.list("NATS_SERVERS"),
+            vacancy_dedup_window=env.int("NATS_VACANCY_DEDUP_WINDOW", 7200),
+            hh_dedup_window=env.int("NATS_HH_DEDUP_WINDOW", 86400),
         ),
         deepseek=DeepSeek(
             api_key=env("DEEPSEEK_API_KEY"),
+            max_concurrency=env.int("DEEPSEEK_MAX_CONCURRENCY", 4),
+            requests_per_second=env.float("DEEPSEEK_RPS", 5.0),
+            tokens_per_minute=env.float("DEEPSEEK_TPM", 0),
+            timeout=env.float("DEEPSEEK_TIMEOUT", 30),
+            verdict_ttl_hours=env.float("DEEPSEEK_VERDICT_TTL_HOURS", 72),
+            verdict_cache_size=env.int("DEEPSEEK_VERDICT_CACHE_SIZE", 20000),
+            local_confidence=env.float("LOCAL_CLASSIFIER_CONFIDENCE", 0.95),
+            local_min_samples=env.int("LOCAL_CLASSIFIER_MIN_SAMPLES", 60),
+            local_retrain_hours=env.float("LOCAL_CLASSIFIER_RETRAIN_HOURS", 6),
+            local_train_days=env.int("LOCAL_CLASSIFIER_TRAIN_DAYS", 60),
+            local_model_dir=env("LOCAL_CLASSIFIER_DIR", "cache/distilled"),
+            gate_accept_score=env.float("GATE_ACCEPT_SCORE", None),
+            gate_reject_score=env.float("GATE_REJECT_SCORE", None),
         ),
         google=Google(
             api_key=env("GOOGLE_API_KEY"),
         ),
+        inference=InferenceSettings(
+            model_name=env.str("EMBEDDING_MODEL", "paraphrase-multilingual-MiniLM-L12-v2"),
+            backend=env.str("EMBEDDING_BACKEND", "torch"),
+            onnx_file=env.str("EMBEDDING_ONNX_FILE", ""),
+            threads=env.int("INFERENCE_THREADS", 1),
+            batch_size=env.int("INFERENCE_BATCH_SIZE", 32),
+            max_wait_ms=env.int("INFERENCE_MAX_WAIT_MS", 5),
+            cache_dir=env.str("EMBEDDING_CACHE_DIR", "cache/embeddings"),
+            cache_size=env.int("EMBEDDING_CACHE_SIZE", 10000),
+            cache_disk_size=env.int("EMBEDDING_CACHE_DISK_SIZE", 100000),
+            snapshot_dir=env.str("PROFESSIONS_SNAPSHOT_DIR", "cache/professions"),
+        ),
+        pipeline=PipelineSettings(
+            fetch_batch=env.int("PIPELINE_FETCH_BATCH", 16),
+            max_in_flight=env.int("PIPELINE_MAX_IN_FLIGHT", 64),
+            decode_concurrency=env.int("PIPELINE_DECODE_CONCURRENCY", 4),
+            classify_concurrency=env.int("PIPELINE_CLASSIFY_CONCURRENCY", 8),
+            llm_concurrency=env.int("PIPELINE_LLM_CONCURRENCY", 8),
+            publish_concurrency=env.int("PIPELINE_PUBLISH_CONCURRENCY", 2),
+            heartbeat_seconds=env.float("PIPELINE_HEARTBEAT_SECONDS", 10),
+        ),
     )
\ No newline at end of file
@@ -0,0 +1,45 @@
+"""add_classifier_samples
+
+Revision ID: 8d1f0a6c2b47
+Revises: 5e2b7c41d9a3
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d1f0a6c2b47'
+down_revision: Union[str, Sequence[str], None] = '5e2b7c41d9a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'classifier_samples',
+        sa.Column('id', postgresql.UUID(as_uuid=True), server_default=sa.text('gen_random_uuid()'), nullable=False),
+        sa.Column('text_hash', sa.Text(), nullable=False),
+        sa.Column('profession_name', sa.Text(), nullable=False),
+        sa.Column('embedding', sa.LargeBinary(), nullable=False),
+        sa.Column('keyword_score', sa.Float(), nullable=False),
+        sa.Column('embedding_score', sa.Float(), nullable=False),
+        sa.Column('verdict', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('text_hash', 'profession_name', name='uq_sample_text_profession'),
+    )
+    op.create_index(op.f('ix_classifier_samples_text_hash'), 'classifier_samples', ['text_hash'], unique=False)
+    op.create_index(op.f('ix_classifier_samples_profession_name'), 'classifier_samples', ['profession_name'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_classifier_samples_profession_name'), table_name='classifier_samples')
+    op.drop_index(op.f('ix_classifier_samples_text_hash'), table_name='classifier_samples')
+    op.drop_table('classifier_samples')
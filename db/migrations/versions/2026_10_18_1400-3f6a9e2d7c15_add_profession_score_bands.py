@@ -0,0 +1,30 @@
+"""add_profession_score_bands
+
+Revision ID: 3f6a9e2d7c15
+Revises: 8d1f0a6c2b47
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f6a9e2d7c15'
+down_revision: Union[str, Sequence[str], None] = '8d1f0a6c2b47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('professions', sa.Column('accept_score', sa.Float(), nullable=True))
+    op.add_column('professions', sa.Column('reject_score', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('professions', 'reject_score')
+    op.drop_column('professions', 'accept_score')
@@ -16,6 +16,8 @@ from .admin_mailings import AdminMailing
 from .admins import Admins
 from .trash import Trash
 from .vacancy_stats import VacancyStat  
+from .classifier_samples import ClassifierSample
+from .chat_filters import ChatFilter
 
 __all__ = [
     "User",
@@ -36,4 +38,6 @@ __all__ = [
     "Admins",
     "Trash",
     "VacancyStat",
+    "ClassifierSample",
+    "ChatFilter",
 ]
@@ -0,0 +1,18 @@
+from sqlalchemy import BigInteger, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from uuid import UUID
+from sqlalchemy import text
+
+from db import Base
+from db.models.mixins import TimestampMixin
+
+
+class ChatFilter(TimestampMixin, Base):
+    # Списки чатов для предфильтра юзербота: allow — читаем только их, deny — не читаем
+    __tablename__ = "chat_filters"
+
+    id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    chat_id: Mapped[int] = mapped_column(BigInteger, unique=True, nullable=False)
+    mode: Mapped[str] = mapped_column(String, nullable=False)  # "allow" | "deny"
+    title: Mapped[str | None] = mapped_column(Text, nullable=True)
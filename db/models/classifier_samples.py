@@ -0,0 +1,25 @@
+from sqlalchemy import Float, Integer, LargeBinary, Text, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from uuid import UUID
+from sqlalchemy import text
+
+from db import Base
+from db.models.mixins import TimestampMixin
+
+
+class ClassifierSample(TimestampMixin, Base):
+    # Решения DeepSeek с признаками классификатора — обучающая выборка локальной модели
+    __tablename__ = "classifier_samples"
+
+    id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    text_hash: Mapped[str] = mapped_column(Text, nullable=False, index=True)
+    profession_name: Mapped[str] = mapped_column(Text, nullable=False, index=True)
+    embedding: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)  # float16
+    keyword_score: Mapped[float] = mapped_column(Float, nullable=False)
+    embedding_score: Mapped[float] = mapped_column(Float, nullable=False)
+    verdict: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("text_hash", "profession_name", name="uq_sample_text_profession"),
+    )
@@ -1,5 +1,5 @@
 from uuid import UUID
-from sqlalchemy import Integer, Text, text
+from sqlalchemy import Float, Integer, Text, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 
@@ -13,6 +13,10 @@ class Profession(Base):
     id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
     name: Mapped[str] = mapped_column(Text, unique=True, nullable=False)
     desc: Mapped[str] = mapped_column(Text, nullable=True)
+    # Границы оценки классификатора: от accept_score — принимаем без DeepSeek,
+    # ниже reject_score — отклоняем без DeepSeek (None — берём из конфига)
+    accept_score: Mapped[float] = mapped_column(Float, nullable=True)
+    reject_score: Mapped[float] = mapped_column(Float, nullable=True)
     
     # связь с таблицей user_professions
     user_professions: Mapped[list["UserProfession"]] = relationship(
@@ -5,9 +5,10 @@ from uuid import UUID
 from sqlalchemy import text
 
 from db import Base
+from db.models.mixins import TimestampMixin
 
 
-class Trash(Base):
+class Trash(TimestampMixin, Base):
     # Список вакансий, найденных парсером
     __tablename__ = "trash"
 
@@ -1,6 +1,6 @@
 import logging
 from datetime import datetime, timedelta
-from sqlalchemy import delete, select, update, func
+from sqlalchemy import delete, select, update, func, literal
 from sqlalchemy.dialects.postgresql import insert as upsert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload, joinedload
@@ -14,6 +14,9 @@ import hashlib
 import asyncio
 
 from db.database import Sessionmaker
+from find_job_process.stopword_matcher import stopword_matcher
+from find_job_process.near_duplicates import near_duplicate_index
+from find_job_process.seen_hashes import seen_hashes
 from db.models import (
     User,
     Keyword,
@@ -31,6 +34,8 @@ from db.models import (
     Admins,
     Trash,
     VacancyStat,
+    ClassifierSample,
+    ChatFilter,
 )
 
 
@@ -377,6 +382,8 @@ async def get_all_professions_parser() -> list[dict]:
                     "name": p.name,
                     "desc": p.desc or "",
                     "keywords": {kw.word: kw.weight for kw in p.keywords},
+                    "accept_score": p.accept_score,
+                    "reject_score": p.reject_score,
                 }
             )
         return professions_data
@@ -670,10 +677,11 @@ async def save_vacancy_hash(
     forwarding_source=None,
 ) -> UUID | None:
     async with Sessionmaker() as session:
-        # Проверяем, есть ли вакансия с таким хэшем
-        existing = await get_vacancy_by_hash(text_hash)
-        if existing:
-            return existing.id
+        # Проверяем, есть ли вакансия с таким хэшем (фильтр отсекает заведомо новые)
+        if seen_hashes.might_contain(text_hash):
+            existing = await get_vacancy_by_hash(text_hash)
+            if existing:
+                return existing.id
 
         res = select(Profession).where(Profession.name == proffname)
         result = await session.execute(res)
@@ -696,6 +704,8 @@ async def save_vacancy_hash(
         try:
             await session.commit()
             await session.refresh(vacancy)
+            seen_hashes.add(text_hash)
+            near_duplicate_index.add(text_hash, text, "vacancy")
             return vacancy.id
         except IntegrityError:
             await session.rollback()
@@ -731,17 +741,18 @@ async def return_vacancy_by_id(
 
 
 async def load_stopwords():
-    # если кэш уже есть, возвращаем его
-    if hasattr(load_stopwords, "cache"):
+    # если кэш уже есть и набор стоп-слов не менялся, возвращаем его
+    if hasattr(load_stopwords, "cache") and not stopword_matcher.is_stale:
         return load_stopwords.cache
 
     async with Sessionmaker() as session:
         result = await session.execute(select(StopWord))
         stopwords = result.scalars().all()
 
-    # создаём кэш и сохраняем как атрибут функции
+    # создаём кэш, сохраняем как атрибут функции и пересобираем шаблон
     load_stopwords.cache = {sw.word.lower() for sw in stopwords}
-    print(f"Stopwords loaded: {len(load_stopwords.cache)}")
+    stopword_matcher.build(load_stopwords.cache)
+    logger.info(f"Stopwords loaded: {len(load_stopwords.cache)}")
     return load_stopwords.cache
 
 
@@ -864,6 +875,23 @@ async def db_add_profession_desc(session: AsyncSession, profession_id: int, desc
         return False
 
 
+async def db_set_profession_gate(
+    session: AsyncSession,
+    profession_id: int,
+    accept_score: float | None,
+    reject_score: float | None,
+) -> bool:
+    profession = await session.get(Profession, profession_id)
+    if profession:
+        profession.accept_score = accept_score
+        profession.reject_score = reject_score
+        await session.commit()
+        return True
+    else:
+        logger.error(f"Failed to set score bands for profession ID {profession_id}")
+        return False
+
+
 async def db_delete_profession_desc(session: AsyncSession, profession_id: int):
     profession = await session.get(Profession, profession_id)
     if profession:
@@ -881,6 +909,7 @@ async def db_add_stopword(session: AsyncSession, word: str):
     try:
         await session.execute(stmt)
         await session.commit()
+        stopword_matcher.invalidate()
         return True
     except Exception as e:
         logger.error(f"Error adding stopword '{word}': {e}")
@@ -892,6 +921,7 @@ async def db_delete_stopword(session: AsyncSession, stopword_id: str):
     try:
         await session.execute(stmt)
         await session.commit()
+        stopword_matcher.invalidate()
         return True
     except Exception as e:
         logger.error(f"Error deleting stopword ID {stopword_id}: {e}")
@@ -1184,9 +1214,150 @@ async def save_in_trash(text, hash) -> bool:
         trash = Trash(text=text, hash=hash)
         session.add(trash)
         await session.commit()
+        seen_hashes.add(hash)
+        near_duplicate_index.add(hash, text, "trash")
         return True
 
 
+async def get_classifier_replay_rows(limit: int | None = None) -> dict:
+    """
+    Данные для офлайн-бенчмарка классификатора: профессии с ключевыми словами,
+    стоп-слова, вакансии (кроме hh.ru — они не проходят классификацию) и корзина.
+    """
+    professions = await get_all_professions_parser()
+    async with Sessionmaker() as session:
+        stopwords = (await session.execute(select(StopWord.word))).scalars().all()
+
+        vacancies_stmt = (
+            select(Vacancy.hash, Vacancy.text, Profession.name)
+            .join(Profession, Profession.id == Vacancy.profession_id)
+            .where(Vacancy.url != "Вакансия с hh.ru")
+            .order_by(Vacancy.created_at.desc())
+        )
+        trash_stmt = select(Trash.hash, Trash.text).order_by(Trash.created_at.desc())
+        if limit:
+            vacancies_stmt = vacancies_stmt.limit(limit)
+            trash_stmt = trash_stmt.limit(limit)
+
+        vacancies = (await session.execute(vacancies_stmt)).all()
+        trash = (await session.execute(trash_stmt)).all()
+
+    return {
+        "professions": professions,
+        "stopwords": list(stopwords),
+        "vacancies": [
+            {"hash": h, "text": text, "profession": name} for h, text, name in vacancies
+        ],
+        "trash": [{"hash": h, "text": text} for h, text in trash],
+    }
+
+
+async def get_recent_texts_for_dedup(days: int) -> list[tuple[str, str, datetime, str]]:
+    """Хэш, текст, дата и решение по вакансиям и корзине за последние дни."""
+    cutoff = datetime.now(MOSCOW_TZ) - timedelta(days=days)
+    async with Sessionmaker() as session:
+        vacancies = await session.execute(
+            select(Vacancy.hash, Vacancy.text, Vacancy.created_at).where(
+                Vacancy.created_at >= cutoff, Vacancy.hash.is_not(None)
+            )
+        )
+        trash = await session.execute(
+            select(Trash.hash, Trash.text, Trash.created_at).where(
+                Trash.created_at >= cutoff, Trash.hash.is_not(None)
+            )
+        )
+        return [(*row, "vacancy") for row in vacancies.all()] + [
+            (*row, "trash") for row in trash.all()
+        ]
+
+
+async def save_classifier_samples(samples: list[dict]) -> None:
+    """Сохраняет решения DeepSeek с признаками; повтор пары текст/профессия пропускается."""
+    if not samples:
+        return
+    async with Sessionmaker() as session:
+        stmt = upsert(ClassifierSample).values(samples)
+        stmt = stmt.on_conflict_do_nothing(
+            index_elements=["text_hash", "profession_name"]
+        )
+        try:
+            await session.execute(stmt)
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            logger.error(f"❌ Ошибка сохранения обучающих примеров: {e}")
+
+
+async def get_classifier_samples(days: int) -> list[tuple[str, bytes, float, float, int]]:
+    """Обучающие примеры локальной модели за последние days дней."""
+    since = datetime.now(MOSCOW_TZ) - timedelta(days=days)
+    async with Sessionmaker() as session:
+        result = await session.execute(
+            select(
+                ClassifierSample.profession_name,
+                ClassifierSample.embedding,
+                ClassifierSample.keyword_score,
+                ClassifierSample.embedding_score,
+                ClassifierSample.verdict,
+            ).where(ClassifierSample.created_at >= since)
+        )
+        return [tuple(row) for row in result.all()]
+
+
+async def load_known_hashes() -> None:
+    """Загружает хэши всех вакансий и корзины в фильтр seen_hashes."""
+    async with Sessionmaker() as session:
+        result = await session.execute(
+            select(Trash.hash).where(Trash.hash.is_not(None)).union(
+                select(Vacancy.hash).where(Vacancy.hash.is_not(None))
+            )
+        )
+        hashes = result.scalars().all()
+    await asyncio.to_thread(seen_hashes.load, hashes)
+
+
+async def check_known_hash(text_hash: str) -> str | None:
+    """
+    Где уже лежит текст с таким хэшем: "trash", "vacancy" или None.
+    Заведомо новые хэши отсекаются фильтром без обращения к БД,
+    при возможном совпадении — один запрос по обеим таблицам.
+    """
+    if not seen_hashes.might_contain(text_hash):
+        return None
+    async with Sessionmaker() as session:
+        stmt = (
+            select(literal("trash").label("kind")).where(Trash.hash == text_hash)
+            .union_all(select(literal("vacancy").label("kind")).where(Vacancy.hash == text_hash))
+            .limit(1)
+        )
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none()
+
+
+async def get_chat_filters() -> dict[int, str]:
+    """Списки чатов предфильтра юзербота: {chat_id: "allow" | "deny"}."""
+    async with Sessionmaker() as session:
+        result = await session.execute(select(ChatFilter.chat_id, ChatFilter.mode))
+        return {chat_id: mode for chat_id, mode in result.all()}
+
+
+async def db_set_chat_filter(chat_id: int, mode: str, title: str | None = None) -> None:
+    async with Sessionmaker() as session:
+        stmt = upsert(ChatFilter).values(chat_id=chat_id, mode=mode, title=title)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ChatFilter.chat_id],
+            set_={"mode": mode, "title": title},
+        )
+        await session.execute(stmt)
+        await session.commit()
+
+
+async def db_delete_chat_filter(chat_id: int) -> None:
+    async with Sessionmaker() as session:
+        await session.execute(delete(ChatFilter).where(ChatFilter.chat_id == chat_id))
+        await session.commit()
+
+
 async def is_in_trash(hash) -> bool:
     async with Sessionmaker() as session:
         stmt = select(Trash).where(Trash.hash == hash)
@@ -0,0 +1,77 @@
+# backend_parity.py
+"""
+Проверка согласия бэкенда эмбеддингов с эталонным torch-бэкендом.
+
+    python -m find_job_process.backend_parity --backend onnx-int8
+    python -m find_job_process.backend_parity --backend onnx --fixture fixture.jsonl --min-cosine 0.99
+
+Тексты — примеры стоп-категорий и описания/вакансии из фикстуры бенчмарка (если указана).
+Код выхода 1, если минимальный косинус ниже --min-cosine.
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from config.config import load_config
+from find_job_process.embedding_backends import make_backend
+
+config = load_config()
+
+
+def parity_texts(fixture: str | None, limit: int) -> list[str]:
+    from find_job_process.find_job import STOP_EMBEDDINGS
+
+    texts = [sample for samples in STOP_EMBEDDINGS.values() for sample in samples]
+    if fixture:
+        from find_job_process.benchmark import read_fixture
+
+        professions, _, rows = read_fixture(fixture)
+        texts += [p["desc"] for p in professions if p.get("desc")]
+        texts += [row["text"] for row in rows]
+    return texts[:limit]
+
+
+def timed_encode(backend, texts: list[str], batch_size: int) -> tuple[np.ndarray, float]:
+    backend.encode(texts[:batch_size], batch_size)  # прогрев
+    started = time.perf_counter()
+    vectors = backend.encode(texts, batch_size)
+    return vectors, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Сравнение бэкенда эмбеддингов с torch")
+    parser.add_argument("--backend", default="onnx-int8", choices=["onnx", "onnx-int8"])
+    parser.add_argument("--onnx-file", default="")
+    parser.add_argument("--fixture", default=None)
+    parser.add_argument("--limit", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=config.inference.batch_size)
+    parser.add_argument("--min-cosine", type=float, default=0.98)
+    args = parser.parse_args()
+
+    texts = parity_texts(args.fixture, args.limit)
+    model_name = config.inference.model_name
+    reference, reference_time = timed_encode(make_backend("torch", model_name), texts, args.batch_size)
+    candidate, candidate_time = timed_encode(
+        make_backend(args.backend, model_name, args.onnx_file), texts, args.batch_size
+    )
+
+    # векторы нормированы, косинус — скалярное произведение
+    cosines = np.sum(reference * candidate, axis=1)
+    print(f"Текстов: {len(texts)}")
+    print(f"torch: {reference_time / len(texts) * 1000:.2f} мс/текст")
+    print(f"{args.backend}: {candidate_time / len(texts) * 1000:.2f} мс/текст")
+    print(
+        f"Косинус с torch: мин {cosines.min():.4f}, "
+        f"p1 {np.percentile(cosines, 1):.4f}, среднее {cosines.mean():.4f}"
+    )
+
+    if cosines.min() < args.min_cosine:
+        print(f"❌ Согласие ниже {args.min_cosine}")
+        sys.exit(1)
+    print("✅ Согласие в норме")
+
+
+if __name__ == "__main__":
+    main()
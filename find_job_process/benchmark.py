@@ -0,0 +1,241 @@
+# benchmark.py
+"""
+Офлайн-бенчмарк классификатора вакансий.
+
+Выгрузка фикстуры из локального Postgres:
+    python -m find_job_process.benchmark export fixture.jsonl --limit 2000
+
+Прогон фикстуры через этапы классификации (DeepSeek заменён детерминированной заглушкой):
+    python -m find_job_process.benchmark replay fixture.jsonl --embedding-weight 1.5 --threshold 1.3
+
+Строки фикстуры: {"type": "profession" | "stopword" | "vacancy" | "trash", ...}.
+Отчёт: сообщений в секунду, p50/p95 по этапам и согласие с сохранёнными решениями.
+"""
+import argparse
+import asyncio
+import html
+import json
+import logging
+import re
+import time
+from collections import defaultdict
+from functools import wraps
+
+import find_job_process.find_job as find_job
+from find_job_process.embedding_backends import embedding_id
+from find_job_process.embedding_cache import EmbeddingCache
+from find_job_process.stopword_matcher import stopword_matcher
+
+logger = logging.getLogger(__name__)
+
+TAG_RE = re.compile(r"<[^>]+>")
+
+
+def html_to_text(text: str) -> str:
+    """В БД хранится HTML-версия, классификатор же видел исходный текст."""
+    return html.unescape(TAG_RE.sub("", text or ""))
+
+
+# ---------- замеры ----------
+
+
+class StageTimer:
+    def __init__(self) -> None:
+        self.samples: dict[str, list[float]] = defaultdict(list)
+
+    def wrap(self, stage: str, func):
+        @wraps(func)
+        async def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self.samples[stage].append(time.perf_counter() - started)
+
+        return timed
+
+    def wrap_sync(self, stage: str, func):
+        @wraps(func)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.samples[stage].append(time.perf_counter() - started)
+
+        return timed
+
+    def report(self) -> list[str]:
+        lines = [f"{'этап':<12}{'вызовов':>9}{'p50, мс':>10}{'p95, мс':>10}{'ср., мс':>10}"]
+        for stage, values in self.samples.items():
+            values = sorted(values)
+            lines.append(
+                f"{stage:<12}{len(values):>9}"
+                f"{_percentile(values, 50) * 1000:>10.2f}"
+                f"{_percentile(values, 95) * 1000:>10.2f}"
+                f"{sum(values) / len(values) * 1000:>10.2f}"
+            )
+        return lines
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, round(q / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+class StubDeepSeek:
+    """
+    Детерминированная замена ai_proff_check.
+    oracle — отвечает «1» только для профессии, сохранённой в БД для этого текста;
+    accept — всегда «1» (проверка того, что пропускают этапы до LLM).
+    """
+
+    def __init__(self, mode: str, expected: dict[str, str], latency_ms: float) -> None:
+        self.mode = mode
+        self.expected = expected
+        self.latency = latency_ms / 1000
+        self.calls = 0
+
+    async def __call__(self, text: str, proff: str) -> str:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.mode == "accept":
+            return "1"
+        return "1" if self.expected.get(text) == proff else "0"
+
+
+# ---------- выгрузка ----------
+
+
+async def export_fixture(path: str, limit: int | None) -> None:
+    from db.requests import get_classifier_replay_rows
+
+    data = await get_classifier_replay_rows(limit)
+    with open(path, "w", encoding="utf-8") as f:
+        for profession in data["professions"]:
+            f.write(json.dumps({"type": "profession", **profession}, ensure_ascii=False) + "\n")
+        for word in data["stopwords"]:
+            f.write(json.dumps({"type": "stopword", "word": word}, ensure_ascii=False) + "\n")
+        for row in data["vacancies"]:
+            f.write(json.dumps({"type": "vacancy", **row}, ensure_ascii=False) + "\n")
+        for row in data["trash"]:
+            f.write(json.dumps({"type": "trash", **row}, ensure_ascii=False) + "\n")
+    logger.info(
+        f"Фикстура сохранена в {path}: {len(data['vacancies'])} вакансий, {len(data['trash'])} корзина"
+    )
+
+
+# ---------- прогон ----------
+
+
+def read_fixture(path: str) -> tuple[list[dict], list[str], list[dict]]:
+    professions, stopwords, rows = [], [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            kind = item.pop("type")
+            if kind == "profession":
+                professions.append(item)
+            elif kind == "stopword":
+                stopwords.append(item["word"])
+            elif kind in ("vacancy", "trash"):
+                item["decision"] = kind
+                item["text"] = html_to_text(item["text"])
+                rows.append(item)
+    return professions, stopwords, rows
+
+
+async def replay(args) -> None:
+    professions, stopwords, rows = read_fixture(args.fixture)
+
+    # Состояние классификатора берём из фикстуры, а не из БД
+    stopword_matcher.build(stopwords)
+    await find_job.load_professions(professions)
+    await find_job.load_stop_embeddings()
+    find_job.embedding_cache = EmbeddingCache(
+        path="", model_name=embedding_id(find_job.config.inference),
+        memory_size=find_job.config.inference.cache_size, disk_size=0,
+    )
+
+    timer = StageTimer()
+    find_job.contains_any_regex_async = timer.wrap("stopwords", find_job.contains_any_regex_async)
+    find_job.encode_vacancy = timer.wrap("embedding", find_job.encode_vacancy)
+    find_job.check_stop_embeddings = timer.wrap_sync("stop_emb", find_job.check_stop_embeddings)
+    find_job.keyword_index.score = timer.wrap_sync("keywords", find_job.keyword_index.score)
+    classify = timer.wrap("classify", find_job.find_job_func)
+
+    expected = {row["text"]: row.get("profession") for row in rows if row["decision"] == "vacancy"}
+    llm = timer.wrap("llm", StubDeepSeek(args.llm, expected, args.llm_latency_ms))
+    counters = defaultdict(int)
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def run_one(row: dict) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            candidates = await classify(
+                row["text"],
+                embedding_weight=args.embedding_weight,
+                threshold=args.threshold,
+            ) or []
+            accepted = [prof for prof, _ in candidates if await llm(row["text"], prof) == "1"]
+            timer.samples["total"].append(time.perf_counter() - started)
+
+        stored_accept = row["decision"] == "vacancy"
+        counters[row["decision"]] += 1
+        counters["llm_calls"] += len(candidates)
+        if bool(accepted) == stored_accept:
+            counters["decision_agree"] += 1
+        if stored_accept and row.get("profession") in {prof for prof, _ in candidates}:
+            counters["vacancy_recall"] += 1
+        if not stored_accept and not candidates:
+            counters["trash_before_llm"] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run_one(row) for row in rows))
+    elapsed = time.perf_counter() - started
+
+    total = len(rows) or 1
+    vacancies = counters["vacancy"] or 1
+    trash = counters["trash"] or 1
+    print(f"Сообщений: {len(rows)} ({counters['vacancy']} вакансий, {counters['trash']} корзина)")
+    print(f"Пропускная способность: {len(rows) / elapsed:.1f} сообщений/с")
+    print("\n".join(timer.report()))
+    print(f"Согласие с сохранённым решением: {counters['decision_agree'] / total:.1%}")
+    print(f"Профессия вакансии среди кандидатов: {counters['vacancy_recall'] / vacancies:.1%}")
+    print(f"Корзина отсеяна до LLM: {counters['trash_before_llm'] / trash:.1%}")
+    print(f"Вызовов LLM на сообщение: {counters['llm_calls'] / total:.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк классификатора вакансий")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export = sub.add_parser("export", help="выгрузить фикстуру из Postgres")
+    export.add_argument("fixture")
+    export.add_argument("--limit", type=int, default=None)
+
+    run = sub.add_parser("replay", help="прогнать фикстуру через классификатор")
+    run.add_argument("fixture")
+    run.add_argument("--embedding-weight", type=float, default=1.5)
+    run.add_argument("--threshold", type=float, default=1.3)
+    run.add_argument("--concurrency", type=int, default=1)
+    run.add_argument("--llm", choices=["oracle", "accept"], default="oracle")
+    run.add_argument("--llm-latency-ms", type=float, default=0)
+
+    args = parser.parse_args()
+    # find_job настраивает INFO при импорте — в отчёте он только мешает
+    logging.getLogger().setLevel(logging.WARNING)
+
+    if args.command == "export":
+        asyncio.run(export_fixture(args.fixture, args.limit))
+    else:
+        asyncio.run(replay(args))
+
+
+if __name__ == "__main__":
+    main()
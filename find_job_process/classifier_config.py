@@ -0,0 +1,120 @@
+# classifier_config.py
+import asyncio
+import json
+import logging
+import os
+import socket
+from datetime import datetime
+
+from nats.errors import TimeoutError as NatsTimeoutError
+from nats.js.api import KeyValueConfig
+from nats.js.kv import KeyValue
+
+from db.requests import load_stopwords
+from find_job_process.find_job import load_professions
+from find_job_process.stopword_matcher import stopword_matcher
+from parser.prefilter import ingest_filter
+from utils.nats_connect import get_nats_connection
+
+logger = logging.getLogger(__name__)
+
+CLASSIFIER_CONFIG_BUCKET = "classifier_config"
+CLASSIFIER_CONFIG_KEY = "version"
+# Причина публикации, после которой достаточно перечитать списки чатов
+CHAT_FILTER_REASON = "chat_filter"
+
+# Идентификатор процесса: свои же публикации при наблюдении пропускаем
+INSTANCE_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+_reload_lock = asyncio.Lock()
+
+
+async def get_classifier_config_kv(js=None) -> KeyValue:
+    if js is None:
+        _, js = await get_nats_connection()
+    return await js.create_key_value(
+        config=KeyValueConfig(
+            bucket=CLASSIFIER_CONFIG_BUCKET,
+            history=5,
+            storage="file",
+        )
+    )
+
+
+async def reload_classifier(reason: str = "") -> None:
+    """
+    Пересобирает кэши классификатора: стоп-слова, профессии и списки
+    чатов предфильтра. Для правок списков чатов (reason == CHAT_FILTER_REASON)
+    перечитываются только они.
+    Перезагрузки подменяют кэши целиком, поэтому обработка
+    вакансий во время перезагрузки не останавливается.
+    """
+    async with _reload_lock:
+        if reason == CHAT_FILTER_REASON:
+            await ingest_filter.load()
+            return
+        stopword_matcher.invalidate()
+        await load_stopwords()
+        await load_professions()
+        await ingest_filter.load()
+    logger.info(f"🔄 Кэши классификатора перезагружены ({reason or 'без причины'})")
+
+
+async def publish_classifier_update(reason: str) -> None:
+    """
+    Вызывается после правок в админке: перезагружает кэши в текущем процессе
+    и поднимает версию в NATS KV, чтобы остальные процессы сделали то же.
+    """
+    await reload_classifier(reason)
+
+    try:
+        kv = await get_classifier_config_kv()
+        value = {
+            "origin": INSTANCE_ID,
+            "reason": reason,
+            "time": datetime.now().isoformat(),
+        }
+        revision = await kv.put(CLASSIFIER_CONFIG_KEY, json.dumps(value).encode())
+        logger.info(f"📢 Опубликована версия конфигурации классификатора {revision}: {reason}")
+    except Exception as e:
+        logger.error(f"❌ Ошибка публикации версии конфигурации классификатора: {e}")
+
+
+async def watch_classifier_updates(js) -> None:
+    """Следит за версией конфигурации и перезагружает кэши при её изменении."""
+    kv = await get_classifier_config_kv(js)
+    watcher = await kv.watch(CLASSIFIER_CONFIG_KEY)
+    logger.info("👀 Наблюдение за конфигурацией классификатора запущено")
+
+    initial = True
+    while True:
+        try:
+            entry = await watcher.updates(timeout=60)
+        except NatsTimeoutError:
+            continue
+        except Exception as e:
+            logger.error(f"❌ Ошибка наблюдения за конфигурацией классификатора: {e}")
+            await asyncio.sleep(5)
+            continue
+
+        # None приходит, когда отданы все начальные значения:
+        # они уже учтены загрузкой при старте
+        if entry is None:
+            initial = False
+            continue
+        if initial or entry.operation is not None or not entry.value:
+            continue
+
+        try:
+            value = json.loads(entry.value.decode())
+        except Exception:
+            value = {}
+        if value.get("origin") == INSTANCE_ID:
+            continue
+
+        reason = value.get("reason", "")
+        logger.info(f"🔄 Новая версия конфигурации классификатора {entry.revision}: {reason}")
+        try:
+            await reload_classifier(reason)
+        except Exception as e:
+            logger.error(f"❌ Ошибка перезагрузки кэшей классификатора: {e}")
@@ -0,0 +1,203 @@
+# distilled.py
+"""
+Локальная модель, обученная на решениях DeepSeek.
+
+Каждое решение DeepSeek сохраняется вместе с признаками классификатора
+(эмбеддинг вакансии, очки по ключевым словам, сходство с описанием профессии).
+Периодически на них обучается логистическая регрессия для каждой профессии
+с калибровкой вероятностей; если модель уверена сильнее заданной границы,
+DeepSeek не вызывается.
+"""
+import asyncio
+import logging
+import os
+import time
+
+import joblib
+import numpy as np
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from config.config import load_config
+from find_job_process.embedding_backends import embedding_id
+from db.requests import get_classifier_samples, save_classifier_samples
+
+config = load_config()
+logger = logging.getLogger(__name__)
+
+MODEL_VERSION = 1
+MIN_CLASS_SAMPLES = 10  # меньше примеров одного класса — калибровке верить нельзя
+
+
+def make_features(embedding: np.ndarray, keyword_score: float, embedding_score: float) -> np.ndarray:
+    return np.concatenate(
+        [embedding.astype(np.float32), np.array([keyword_score, embedding_score], dtype=np.float32)]
+    )
+
+
+class DistilledClassifier:
+    def __init__(self, path: str, model_name: str, confidence: float, min_samples: int) -> None:
+        self.path = os.path.join(path, "model.joblib") if path else ""
+        self.model_name = model_name
+        self.confidence = confidence
+        self.min_samples = min_samples
+        self.models: dict[str, object] = {}
+        self.trained_at: float | None = None
+
+        self.accepted = 0
+        self.rejected = 0
+        self.deferred = 0
+
+    # ---------- обучение ----------
+
+    def fit(self, samples: list[tuple[str, bytes, float, float, int]]) -> dict[str, object]:
+        """Обучает модели по профессиям; выполняется в отдельном потоке."""
+        by_profession: dict[str, tuple[list, list]] = {}
+        for proff, embedding, keyword_score, embedding_score, verdict in samples:
+            vector = np.frombuffer(embedding, dtype=np.float16)
+            features, labels = by_profession.setdefault(proff, ([], []))
+            features.append(make_features(vector, keyword_score, embedding_score))
+            labels.append(verdict)
+
+        models = {}
+        for proff, (features, labels) in by_profession.items():
+            labels = np.array(labels)
+            positives = int(labels.sum())
+            if len(labels) < self.min_samples or min(positives, len(labels) - positives) < MIN_CLASS_SAMPLES:
+                continue
+            model = CalibratedClassifierCV(
+                make_pipeline(
+                    StandardScaler(),
+                    LogisticRegression(C=0.5, max_iter=1000, class_weight="balanced"),
+                ),
+                method="sigmoid",
+                cv=3,
+            )
+            model.fit(np.stack(features), labels)
+            models[proff] = model
+        return models
+
+    def load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            data = joblib.load(self.path)
+        except Exception as e:
+            logger.warning(f"⚠️ Не удалось прочитать локальную модель: {e}")
+            return
+        if data.get("version") != MODEL_VERSION or data.get("model") != self.model_name:
+            logger.info("Локальная модель обучена под другую модель эмбеддингов, не используем")
+            return
+        self.models = data["models"]
+        self.trained_at = data["trained_at"]
+        logger.info(f"🧠 Локальная модель загружена: {len(self.models)} профессий")
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        joblib.dump(
+            {
+                "version": MODEL_VERSION,
+                "model": self.model_name,
+                "models": self.models,
+                "trained_at": self.trained_at,
+            },
+            tmp,
+        )
+        os.replace(tmp, self.path)
+
+    # ---------- предсказание ----------
+
+    def predict(self, proff: str, embedding: np.ndarray, keyword_score: float, embedding_score: float) -> float | None:
+        """Откалиброванная вероятность «1» или None, если для профессии модели нет."""
+        model = self.models.get(proff)
+        if model is None:
+            return None
+        features = make_features(embedding, keyword_score, embedding_score)
+        return float(model.predict_proba(features[None, :])[0, 1])
+
+    def decide_many(
+        self, embedding: np.ndarray, features: dict[str, tuple[float, float]]
+    ) -> dict[str, str]:
+        """Решения только для уверенных профессий; остальные остаются DeepSeek."""
+        decided = {}
+        for proff, (keyword_score, embedding_score) in features.items():
+            probability = self.predict(proff, embedding, keyword_score, embedding_score)
+            if probability is not None and probability >= self.confidence:
+                decided[proff] = "1"
+                self.accepted += 1
+            elif probability is not None and probability <= 1 - self.confidence:
+                decided[proff] = "0"
+                self.rejected += 1
+            else:
+                self.deferred += 1
+        return decided
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "professions": len(self.models),
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "deferred": self.deferred,
+        }
+
+
+distilled_classifier = DistilledClassifier(
+    path=config.deepseek.local_model_dir,
+    model_name=embedding_id(config.inference),
+    confidence=config.deepseek.local_confidence,
+    min_samples=config.deepseek.local_min_samples,
+)
+
+
+async def log_training_samples(
+    text_hash: str,
+    embedding: np.ndarray,
+    features: dict[str, tuple[float, float]],
+    verdicts: dict[str, str],
+) -> None:
+    """Сохраняет решения DeepSeek вместе с признаками классификатора."""
+    vector = embedding.astype(np.float16).tobytes()
+    await save_classifier_samples(
+        [
+            {
+                "text_hash": text_hash,
+                "profession_name": proff,
+                "embedding": vector,
+                "keyword_score": features[proff][0],
+                "embedding_score": features[proff][1],
+                "verdict": int(verdict),
+            }
+            for proff, verdict in verdicts.items()
+            if proff in features and verdict in ("0", "1")
+        ]
+    )
+
+
+async def train_distilled_classifier() -> None:
+    samples = await get_classifier_samples(config.deepseek.local_train_days)
+    models = await asyncio.to_thread(distilled_classifier.fit, samples)
+    distilled_classifier.models = models
+    distilled_classifier.trained_at = time.time()
+    await asyncio.to_thread(distilled_classifier.save)
+    logger.info(
+        f"🧠 Локальная модель обучена: {len(models)} профессий, {len(samples)} примеров"
+    )
+
+
+async def distilled_training_loop() -> None:
+    """Фоновая задача: загрузка сохранённой модели и периодическое переобучение."""
+    distilled_classifier.load()
+    interval = config.deepseek.local_retrain_hours * 3600
+    while True:
+        trained_at = distilled_classifier.trained_at or 0
+        await asyncio.sleep(max(0, trained_at + interval - time.time()))
+        try:
+            await train_distilled_classifier()
+        except Exception as e:
+            logger.error(f"❌ Ошибка обучения локальной модели: {e}")
+            await asyncio.sleep(600)
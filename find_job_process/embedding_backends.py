@@ -0,0 +1,123 @@
+# embedding_backends.py
+"""
+Бэкенды эмбеддингов для InferenceExecutor.
+
+torch      — SentenceTransformer на PyTorch (fp32), как раньше;
+onnx       — тот же MiniLM, экспортированный в ONNX, через onnxruntime;
+onnx-int8  — динамически квантованная int8-версия ONNX-модели.
+
+ONNX-файлы берутся из репозитория модели на Hugging Face (sentence-transformers
+публикует их в папке onnx/), токенизатор — тот же, что у исходной модели.
+Все бэкенды возвращают нормированные float32-векторы.
+"""
+import logging
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ONNX_FILES = {
+    "onnx": "onnx/model.onnx",
+    "onnx-int8": "onnx/model_quint8_avx2.onnx",
+}
+MAX_SEQ_LENGTH = 128  # как у paraphrase-multilingual-MiniLM-L12-v2 в SentenceTransformer
+
+
+def embedding_id(settings) -> str:
+    """
+    Идентификатор пространства эмбеддингов для кэшей и снимков: векторы
+    разных бэкендов немного отличаются, смешивать их в одном кэше нельзя.
+    Для torch совпадает с именем модели, чтобы не сбрасывать старые кэши.
+    """
+    if settings.backend == "torch":
+        return settings.model_name
+    return f"{settings.model_name}:{settings.backend}:{settings.onnx_file or ONNX_FILES[settings.backend]}"
+
+
+class EmbeddingBackend(ABC):
+    name = ""
+
+    @abstractmethod
+    def encode(self, texts: list[str], batch_size: int) -> np.ndarray:
+        """Матрица нормированных эмбеддингов (len(texts) × dim), float32."""
+
+
+class TorchBackend(EmbeddingBackend):
+    name = "torch"
+
+    def __init__(self, model_name: str) -> None:
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name)
+
+    def encode(self, texts: list[str], batch_size: int) -> np.ndarray:
+        import torch
+
+        with torch.inference_mode():
+            return self.model.encode(
+                texts,
+                batch_size=batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+            ).astype(np.float32)
+
+
+class OnnxBackend(EmbeddingBackend):
+    """Токенизатор transformers + onnxruntime + mean pooling, как в SentenceTransformer."""
+
+    def __init__(self, model_name: str, file_name: str, threads: int = 0) -> None:
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise RuntimeError("Для ONNX-бэкенда установите onnxruntime") from e
+        from huggingface_hub import hf_hub_download
+        from transformers import AutoTokenizer
+
+        repo_id = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+        self.name = f"onnx:{file_name}"
+        self.tokenizer = AutoTokenizer.from_pretrained(repo_id)
+
+        options = ort.SessionOptions()
+        if threads > 0:  # 0 — onnxruntime сам выбирает число потоков
+            options.intra_op_num_threads = threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            hf_hub_download(repo_id, file_name),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def encode(self, texts: list[str], batch_size: int) -> np.ndarray:
+        chunks = []
+        for start in range(0, len(texts), batch_size):
+            tokens = self.tokenizer(
+                texts[start : start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=MAX_SEQ_LENGTH,
+                return_tensors="np",
+            )
+            feed = {
+                name: value.astype(np.int64)
+                for name, value in tokens.items()
+                if name in self.input_names
+            }
+            token_embeddings = self.session.run(None, feed)[0]
+
+            # mean pooling по значащим токенам и L2-нормировка
+            mask = tokens["attention_mask"][..., None].astype(np.float32)
+            summed = (token_embeddings * mask).sum(axis=1)
+            pooled = summed / np.clip(mask.sum(axis=1), 1e-9, None)
+            norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+            chunks.append((pooled / np.clip(norms, 1e-12, None)).astype(np.float32))
+        return np.concatenate(chunks) if chunks else np.zeros((0, 0), dtype=np.float32)
+
+
+def make_backend(backend: str, model_name: str, onnx_file: str = "", threads: int = 0) -> EmbeddingBackend:
+    if backend == "torch":
+        return TorchBackend(model_name)
+    if backend in ONNX_FILES:
+        return OnnxBackend(model_name, onnx_file or ONNX_FILES[backend], threads=threads)
+    raise ValueError(f"Неизвестный бэкенд эмбеддингов: {backend}")
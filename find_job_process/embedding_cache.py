@@ -0,0 +1,203 @@
+# embedding_cache.py
+import asyncio
+import json
+import logging
+import os
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FLUSH_EVERY = 64  # как часто сбрасывать memmap на диск (в записях)
+
+
+class _DiskStore:
+    """
+    Кольцевой буфер эмбеддингов на диске: vectors.f16 (capacity × dim, float16),
+    hashes.bin (capacity × hex sha256) и курсор следующей ячейки.
+    Файлы открываются через np.memmap, поэтому переживают рестарт.
+    """
+
+    def __init__(self, path: str, model_name: str, dim: int, capacity: int) -> None:
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, "meta.json")
+        meta = {"model": model_name, "dim": dim, "capacity": capacity}
+
+        fresh = True
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                fresh = json.load(f) != meta
+        mode = "w+" if fresh else "r+"
+        if fresh:
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+
+        self.capacity = capacity
+        self.vectors = np.memmap(
+            os.path.join(path, "vectors.f16"), dtype=np.float16, mode=mode, shape=(capacity, dim)
+        )
+        self.hashes = np.memmap(
+            os.path.join(path, "hashes.bin"), dtype="S64", mode=mode, shape=(capacity,)
+        )
+        self.cursor = np.memmap(
+            os.path.join(path, "cursor.bin"), dtype=np.int64, mode=mode, shape=(1,)
+        )
+        self.index: dict[bytes, int] = {
+            digest: slot for slot, digest in enumerate(self.hashes) if digest
+        }
+        self._dirty = 0
+        logger.info(f"💾 Дисковый кэш эмбеддингов открыт: {len(self.index)} записей")
+
+    def get(self, digest: bytes) -> np.ndarray | None:
+        slot = self.index.get(digest)
+        if slot is None:
+            return None
+        return np.array(self.vectors[slot])
+
+    def put(self, digest: bytes, vector: np.ndarray) -> None:
+        if digest in self.index:
+            return
+        slot = int(self.cursor[0]) % self.capacity
+        old = self.hashes[slot]
+        if old:
+            self.index.pop(old, None)
+
+        self.vectors[slot] = vector
+        self.hashes[slot] = digest
+        self.cursor[0] = slot + 1
+        self.index[digest] = slot
+
+        self._dirty += 1
+        if self._dirty >= FLUSH_EVERY:
+            self.flush()
+
+    def flush(self) -> None:
+        self.vectors.flush()
+        self.hashes.flush()
+        self.cursor.flush()
+        self._dirty = 0
+
+
+class EmbeddingCache:
+    """
+    Кэш эмбеддингов по sha256 текста: LRU в памяти поверх дискового
+    кольцевого буфера float16. Одновременные запросы одного и того же
+    текста ждут одно вычисление, а не гоняют модель повторно.
+    """
+
+    def __init__(self, path: str, model_name: str, memory_size: int, disk_size: int) -> None:
+        self.path = path
+        self.model_name = model_name
+        self.memory_size = memory_size
+        self.disk_size = disk_size
+        self._memory: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._disk: _DiskStore | None = None
+        self._disk_failed = False
+        self._disk_checked = False
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _open_disk(self, dim: int) -> _DiskStore | None:
+        if self._disk is None and not self._disk_failed and self.disk_size > 0:
+            try:
+                self._disk = _DiskStore(self.path, self.model_name, dim, self.disk_size)
+            except Exception as e:
+                self._disk_failed = True
+                logger.error(f"❌ Не удалось открыть дисковый кэш эмбеддингов: {e}")
+        return self._disk
+
+    def _open_existing_disk(self) -> None:
+        """Открывает сохранённый кэш, если он собран той же моделью."""
+        self._disk_checked = True
+        meta_path = os.path.join(self.path, "meta.json")
+        if not os.path.exists(meta_path):
+            return
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        except Exception as e:
+            logger.warning(f"⚠️ Не удалось прочитать meta кэша эмбеддингов: {e}")
+            return
+        if meta.get("model") == self.model_name and meta.get("dim"):
+            self._open_disk(meta["dim"])
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> np.ndarray | None:
+        vector = self._memory.get(key)
+        if vector is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return vector
+
+        if self._disk is None and not self._disk_checked:
+            self._open_existing_disk()
+        if self._disk is not None:
+            vector = self._disk.get(key.encode())
+            if vector is not None:
+                self._remember(key, vector)
+                self.disk_hits += 1
+                return vector
+        return None
+
+    def put(self, key: str, vector: np.ndarray) -> None:
+        vector = np.asarray(vector, dtype=np.float16)
+        self._remember(key, vector)
+        disk = self._open_disk(vector.shape[-1])
+        if disk is not None:
+            try:
+                disk.put(key.encode(), vector)
+            except Exception as e:
+                logger.error(f"❌ Ошибка записи в дисковый кэш эмбеддингов: {e}")
+
+    async def get_or_compute(
+        self, key: str, compute: Callable[[], Awaitable[np.ndarray]]
+    ) -> np.ndarray:
+        vector = self.get(key)
+        if vector is not None:
+            return vector
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            vector = np.asarray(await compute(), dtype=np.float16)
+            self.put(key, vector)
+            future.set_result(vector)
+            return vector
+        except Exception as e:
+            future.set_exception(e)
+            # исключение уже отдано ожидающим; гасим «never retrieved»
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def flush(self) -> None:
+        if self._disk is not None:
+            self._disk.flush()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "memory_size": len(self._memory),
+            "disk_size": len(self._disk.index) if self._disk is not None else 0,
+        }
@@ -1,23 +1,72 @@
 import asyncio
-from sentence_transformers import SentenceTransformer, util
+import numpy as np
+from config.config import load_config
 from db.requests import stopwords_cache
-from db.requests import get_all_professions_parser, get_all_stopwords
+from db.requests import (
+    get_all_professions_parser,
+    load_stopwords,
+    get_recent_texts_for_dedup,
+)
+from find_job_process.near_duplicates import near_duplicate_index, minhash_signature
+from find_job_process.stopword_matcher import stopword_matcher
+from find_job_process.keyword_index import KeywordIndex
+from find_job_process.inference import InferenceExecutor
+from find_job_process.embedding_backends import embedding_id
+from find_job_process.embedding_cache import EmbeddingCache
+from find_job_process.profession_snapshot import ProfessionSnapshot
+from find_job_process.verdict_cache import verdict_cache, profession_fingerprint
+from find_job_process.gating import gating_policy
 from db.database import Sessionmaker
 from db.models import StopWord
 from utils.bot_utils import send_message
 from sqlalchemy.future import select
 import logging
+import hashlib
 import re
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
-
-model = SentenceTransformer("paraphrase-multilingual-MiniLM-L12-v2")
+config = load_config()
+
+# Модель живёт в потоках исполнителя, event loop не блокируется на encode
+inference = InferenceExecutor(
+    model_name=config.inference.model_name,
+    threads=config.inference.threads,
+    batch_size=config.inference.batch_size,
+    max_wait_ms=config.inference.max_wait_ms,
+    backend=config.inference.backend,
+    onnx_file=config.inference.onnx_file,
+)
+
+# Эмбеддинги вакансий по sha256 текста: повторы не доходят до модели
+embedding_cache = EmbeddingCache(
+    path=config.inference.cache_dir,
+    model_name=embedding_id(config.inference),
+    memory_size=config.inference.cache_size,
+    disk_size=config.inference.cache_disk_size,
+)
+
+# Эмбеддинги описаний профессий, переживающие рестарт
+profession_snapshot = ProfessionSnapshot(
+    path=config.inference.snapshot_dir,
+    model_name=embedding_id(config.inference),
+)
+_snapshot_lock = asyncio.Lock()
 
 professions_cache: dict[str, any] = {}
 professions_embeddings_cache: dict[str, any] = {}
+# Матрица нормированных эмбеддингов описаний (n_professions × dim)
+# и параллельный список имён профессий по строкам матрицы
+professions_matrix = None
+professions_index: list[str] = []
+keyword_index = KeywordIndex()
 stopwords_cache: set[str] = set()
-stop_embeddings = set()
+# Эмбеддинги примеров спама по категориям: матрица (n_samples × dim) на категорию,
+# плюс склеенная матрица всех примеров и номер категории каждой строки
+stop_embeddings: dict[str, np.ndarray] = {}
+stop_matrix = None
+stop_rows_category = None
+stop_categories: list[str] = []
 
 
 STOP_EMBEDDINGS_ADS = [
@@ -109,26 +158,46 @@ STOP_EMBEDDINGS = {
     "misc": STOP_EMBEDDINGS_MISC,
 }
 
-def load_stop_embeddings():
-    global stop_embeddings
-    
-    stop_embeddings = {
-        cat: [model.encode(text, convert_to_tensor=True) for text in samples]
-        for cat, samples in STOP_EMBEDDINGS.items()
-    }
+async def load_stop_embeddings():
+    """Кодирует все примеры спама одним батчем и собирает матрицы по категориям."""
+    global stop_embeddings, stop_matrix, stop_rows_category, stop_categories
+
+    categories = list(STOP_EMBEDDINGS.keys())
+    samples = [sample for cat in categories for sample in STOP_EMBEDDINGS[cat]]
+    rows_category = np.array(
+        [i for i, cat in enumerate(categories) for _ in STOP_EMBEDDINGS[cat]]
+    )
+    matrix = np.asarray(await inference.encode_many(samples), dtype=np.float32)
+
+    stop_embeddings = {cat: matrix[rows_category == i] for i, cat in enumerate(categories)}
+    stop_categories = categories
+    stop_rows_category = rows_category
+    stop_matrix = matrix
 
 
-def check_stop_embeddings(text: str, threshold: float = 0.55) -> str | None:
-    stop_embeddings = get_stop_embeddings()
-    text_emb = model.encode(text, convert_to_tensor=True)
-    for cat, emb_list in stop_embeddings.items():
-        sims = [util.cos_sim(text_emb, e).item() for e in emb_list]
-        if max(sims) > threshold:
-            return cat
+def check_stop_embeddings(
+    text_emb: np.ndarray, threshold: float | None = None
+) -> tuple[str, float] | None:
+    """
+    Сравнивает готовый эмбеддинг сообщения со всеми примерами спама одним
+    умножением матрицы на вектор. Возвращает (категория, сходство) или None.
+    """
+    if threshold is None:
+        threshold = config.parser.stop_embedding_threshold
+    if stop_matrix is None or threshold >= 1:
+        return None
+
+    sims = stop_matrix @ text_emb.astype(stop_matrix.dtype, copy=False)
+    best = np.full(len(stop_categories), -1.0, dtype=sims.dtype)
+    np.maximum.at(best, stop_rows_category, sims)
+    index = int(np.argmax(best))
+    similarity = float(best[index])
+    if similarity > threshold:
+        return stop_categories[index], similarity
     return None
 
 
-def get_stop_embeddings() -> dict[str, any]:
+def get_stop_embeddings() -> dict[str, np.ndarray]:
     return stop_embeddings
 
 
@@ -146,17 +215,51 @@ def count_stop_words(text: str) -> int:
     return len(found_words)
 
 
-async def load_professions():
+async def embed_descriptions(descs: list[str]) -> np.ndarray | None:
+    """Матрица эмбеддингов описаний с переиспользованием снимка на диске."""
+    if not descs:
+        return None
+
+    async with _snapshot_lock:
+        cached = profession_snapshot.load()
+        keys = [profession_snapshot.key(desc) for desc in descs]
+
+        missing = list(dict.fromkeys(key for key in keys if key not in cached))
+        if missing:
+            key_to_desc = dict(zip(keys, descs))
+            encoded = await inference.encode_many([key_to_desc[key] for key in missing])
+            logger.info(f"Перекодировано описаний профессий: {len(missing)} из {len(descs)}")
+        else:
+            encoded = []
+
+        vectors = {key: cached[key] for key in keys if key in cached}
+        for key, vector in zip(missing, encoded):
+            vectors[key] = vector.astype("float32")
+
+        # сохраняем снимок, только если набор описаний изменился
+        if missing or set(cached) != set(vectors):
+            try:
+                await asyncio.to_thread(profession_snapshot.save, vectors)
+            except Exception as e:
+                logger.error(f"❌ Не удалось сохранить снимок эмбеддингов профессий: {e}")
+
+    return np.stack([vectors[key] for key in keys])
+
+
+async def load_professions(professions: list[dict] | None = None):
     """
     Загружаем все профессии и ключевые слова из БД и обновляем кэши:
     professions_cache и professions_embeddings_cache.
+    Список профессий можно передать явно (офлайн-бенчмарк), тогда БД не нужна.
     """
     global professions_cache, professions_embeddings_cache
+    global professions_matrix, professions_index, keyword_index
 
-    professions = await get_all_professions_parser()
+    if professions is None:
+        professions = await get_all_professions_parser()
 
     # кеш с описаниями и ключевыми словами
-    professions_cache = {
+    new_cache = {
         p["name"]: {
             "desc": p.get("desc", ""),
             "keywords": p.get("keywords", {}),
@@ -164,39 +267,110 @@ async def load_professions():
         for p in professions
     }
 
-    # кеш с эмбеддингами описаний
-    professions_embeddings_cache = {
-        name: model.encode(data["desc"], convert_to_tensor=True)
-        for name, data in professions_cache.items()
-    }
+    # индекс лемм ключевых слов -> (профессия, вес)
+    new_keyword_index = KeywordIndex.build(new_cache)
+
+    # кеш с эмбеддингами описаний: нормированные векторы берём из снимка,
+    # одним батчем кодируем только новые или изменённые описания
+    names = list(new_cache.keys())
+    matrix = await embed_descriptions([new_cache[name]["desc"] for name in names])
+
+    # подменяем кэши разом, после всех await: обработка сообщений
+    # видит либо старый, либо новый согласованный набор
+    professions_cache = new_cache
+    keyword_index = new_keyword_index
+    professions_embeddings_cache = (
+        {name: matrix[i] for i, name in enumerate(names)} if names else {}
+    )
+    professions_index = names
+    professions_matrix = matrix
+
+    # решения DeepSeek по изменённым профессиям больше не должны находиться
+    verdict_cache.set_fingerprints(
+        {
+            name: profession_fingerprint(name, data["desc"], data["keywords"])
+            for name, data in new_cache.items()
+        }
+    )
+    gating_policy.set_bands(
+        {p["name"]: (p.get("accept_score"), p.get("reject_score")) for p in professions}
+    )
+
+
+async def load_near_duplicates():
+    """Заполняет индекс почти-дубликатов вакансиями и корзиной за последние дни."""
+    rows = await get_recent_texts_for_dedup(near_duplicate_index.max_age.days)
+
+    def signatures():
+        return [minhash_signature(text) for _, text, _, _ in rows]
+
+    # MinHash по тысячам текстов считаем вне event loop
+    for (text_hash, text, created_at, decision), signature in zip(
+        rows, await asyncio.to_thread(signatures)
+    ):
+        near_duplicate_index.add(
+            text_hash, text, decision, created_at=created_at, signature=signature
+        )
+    logger.info(f"Индекс почти-дубликатов загружен: {len(near_duplicate_index)} текстов")
 
 
 def get_profession_embeddings() -> dict[str, any]:
     return professions_embeddings_cache
 
 
-import re
-import asyncio
+def get_profession_matrix():
+    """Возвращает (матрица эмбеддингов профессий, список имён по строкам)."""
+    return professions_matrix, professions_index
 
 
-async def contains_any_regex_async(text: str) -> bool:
-    stopwords = await get_all_stopwords()
-    keywords = [sw.word for sw in stopwords]
+async def contains_any_regex_async(text: str) -> list[str]:
+    # Шаблон собирается один раз и пересобирается только после изменения стоп-слов
+    if stopword_matcher.is_stale:
+        await load_stopwords()
+
+    matches = stopword_matcher.find(text)
+    for match in matches:
+        logger.info(f"Found stop word: {match}")
+    return matches
 
-    pattern = re.compile(
-        "|".join(re.escape(k.lower()) for k in keywords), re.IGNORECASE
-    )
 
-    def search():
-        matches = pattern.findall(text.lower())
-        for match in matches:
-            logger.info(f"Found stop word: {match}")
-        return list(set(matches))
+async def encode_vacancy(text: str, text_hash: str | None = None) -> np.ndarray:
+    """Эмбеддинг вакансии через кэш по хэшу текста."""
+    if text_hash is None:
+        text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
 
-    return await asyncio.to_thread(search)
+    async def compute():
+        return await inference.encode(text)
 
+    vector = await embedding_cache.get_or_compute(text_hash, compute)
+    return vector.astype("float32")
 
-async def analyze_vacancy(text: str, embedding_weight: float = 1.5) -> dict:
+
+async def profession_features(
+    text: str, proffs: list[str], text_hash: str | None = None
+) -> tuple[np.ndarray, dict[str, tuple[float, float]]]:
+    """
+    Признаки для локальной модели: эмбеддинг вакансии (из кэша — он уже
+    посчитан в analyze_vacancy) и {профессия: (очки по ключам, сходство)}.
+    """
+    text_emb = await encode_vacancy(text, text_hash)
+    matrix, names = get_profession_matrix()
+    keyword_scores = keyword_index.score(text)
+
+    features = {}
+    rows = {name: i for i, name in enumerate(names)}
+    for proff in proffs:
+        row = rows.get(proff)
+        if row is None:
+            continue
+        similarity = float(matrix[row] @ text_emb.astype(matrix.dtype, copy=False))
+        features[proff] = (float(keyword_scores.get(proff, 0)), similarity)
+    return text_emb, features
+
+
+async def analyze_vacancy(
+    text: str, embedding_weight: float = 1.5, text_hash: str | None = None
+) -> dict:
     found_stopwords = await contains_any_regex_async(text)
 
     if found_stopwords:
@@ -210,49 +384,63 @@ async def analyze_vacancy(text: str, embedding_weight: float = 1.5) -> dict:
             "reason": f"Найдены стоп-слова: {found_str}"
         }
 
-    lowered = text.lower()
+    matrix, names = get_profession_matrix()
+    if matrix is None or not names:
+        return {"status": "ok", "ranked": []}
+
+    # --- эмбеддинг сообщения: нужен и фильтру спама, и профессиям ---
+    text_emb = await encode_vacancy(text, text_hash)
+
+    # --- реклама, резюме, скам: отсев до ключевых слов и DeepSeek ---
+    stop_match = check_stop_embeddings(text_emb)
+    if stop_match:
+        category, similarity = stop_match
+        logger.info(f"Похоже на стоп-категорию {category} (сходство {similarity:.2f})")
+        return {
+            "status": "blocked",
+            "reason": f"Стоп-категория {category} (сходство {similarity:.2f})",
+        }
 
     # --- очки по ключевым словам ---
-    keyword_scores = {}
-    for name, data in professions_cache.items():
-        score = 0
-        for kw, weight in data["keywords"].items():
-            if kw.lower() in lowered:
-                score += weight
-        keyword_scores[name] = score
+    keyword_scores = keyword_index.score(text)
     # print(f"Очки по ключевым словам: {keyword_scores}")
 
-    # --- сходство по эмбеддингам ---
-    text_emb = model.encode(text, convert_to_tensor=True)
-    embeddings = get_profession_embeddings()
-    embedding_scores = {}
-    for name, prof_emb in embeddings.items():
-        sim = util.cos_sim(text_emb, prof_emb).item()
-        embedding_scores[name] = sim
+    # --- сходство по эмбеддингам: одно умножение матрицы на вектор ---
+    embedding_scores = matrix @ text_emb.astype(matrix.dtype, copy=False)
     # print(f"Сходство по эмбеддингам: {embedding_scores}")
 
     # --- итоговый рейтинг ---
-    final_scores = {
-        name: keyword_scores[name] + embedding_weight * embedding_scores[name]
-        for name in professions_cache
-    }
+    keyword_vector = np.array(
+        [keyword_scores.get(name, 0) for name in names],
+        dtype=embedding_scores.dtype,
+    )
+    final_scores = keyword_vector + embedding_weight * embedding_scores
     # print(f"Итоговые рейтинги: {final_scores}")
 
-    ranked = sorted(final_scores.items(), key=lambda x: x[1], reverse=True)
+    order = np.argsort(-final_scores, kind="stable").tolist()
+    values = final_scores.tolist()
+    ranked = [(names[i], values[i]) for i in order]
     return {"status": "ok", "ranked": ranked}
 
 
 # === Пример использования ===
-async def find_job_func(vacancy_text: str, embedding_weight: float = 1.5):
-
-    result = await analyze_vacancy(vacancy_text, embedding_weight=embedding_weight)
+async def find_job_func(
+    vacancy_text: str,
+    embedding_weight: float = 1.5,
+    text_hash: str | None = None,
+    threshold: float = 1.3,
+):
+
+    result = await analyze_vacancy(
+        vacancy_text, embedding_weight=embedding_weight, text_hash=text_hash
+    )
 
     if result["status"] == "blocked":
         # print(f"🚫 Вакансия заблокирована ({result['reason']})")
         return False
 
     vacancy_professions = [
-        (prof, score) for prof, score in result["ranked"] if score > 1.3
+        (prof, score) for prof, score in result["ranked"] if score > threshold
     ]
 
     if not vacancy_professions:
@@ -0,0 +1,77 @@
+# gating.py
+import logging
+from collections import Counter
+
+from config.config import load_config
+
+config = load_config()
+logger = logging.getLogger(__name__)
+
+ACCEPT = "accept"  # принято по оценке, без DeepSeek
+REJECT = "reject"  # отклонено по оценке, без DeepSeek
+LLM = "llm"  # спорная оценка, решает DeepSeek
+
+
+class GatingPolicy:
+    """
+    Политика между оценкой классификатора и DeepSeek: по границам профессии
+    (или общим из конфига) делит кандидатов на принятых, отклонённых
+    и спорных. Считает, сколько кандидатов обработала каждая полоса.
+    """
+
+    def __init__(self, accept_score: float | None, reject_score: float | None) -> None:
+        self.default_accept = accept_score
+        self.default_reject = reject_score
+        self._bands: dict[str, tuple[float | None, float | None]] = {}
+        self.counters: Counter[tuple[str, str]] = Counter()
+
+    def set_bands(self, bands: dict[str, tuple[float | None, float | None]]) -> None:
+        """Вызывается при загрузке профессий: {профессия: (accept_score, reject_score)}."""
+        self._bands = dict(bands)
+
+    def bands(self, proff: str) -> tuple[float | None, float | None]:
+        accept, reject = self._bands.get(proff, (None, None))
+        return (
+            accept if accept is not None else self.default_accept,
+            reject if reject is not None else self.default_reject,
+        )
+
+    def band(self, proff: str, score: float) -> str:
+        accept, reject = self.bands(proff)
+        if accept is not None and score >= accept:
+            return ACCEPT
+        if reject is not None and score < reject:
+            return REJECT
+        return LLM
+
+    def split(self, found_proffs: list[tuple[str, float]]) -> tuple[dict[str, str], list[str]]:
+        """
+        Возвращает (решения {профессия: "0" | "1"} без DeepSeek,
+        профессии, которые нужно проверить в DeepSeek).
+        """
+        decided, uncertain = {}, []
+        for proff, score in found_proffs:
+            band = self.band(proff, score)
+            self.counters[(proff, band)] += 1
+            if band == ACCEPT:
+                decided[proff] = "1"
+            elif band == REJECT:
+                decided[proff] = "0"
+            else:
+                uncertain.append(proff)
+        if decided:
+            logger.info(f"🚦 Решено по оценке без DeepSeek: {decided}")
+        return decided, uncertain
+
+    def stats(self, proff: str | None = None) -> dict[str, int]:
+        totals = Counter()
+        for (name, band), count in self.counters.items():
+            if proff is None or name == proff:
+                totals[band] += count
+        return {band: totals[band] for band in (ACCEPT, REJECT, LLM)}
+
+
+gating_policy = GatingPolicy(
+    accept_score=config.deepseek.gate_accept_score,
+    reject_score=config.deepseek.gate_reject_score,
+)
@@ -0,0 +1,133 @@
+# inference.py
+import asyncio
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from find_job_process.embedding_backends import EmbeddingBackend, make_backend
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _EncodeJob:
+    texts: list[str]
+    future: asyncio.Future
+    loop: asyncio.AbstractEventLoop
+
+
+class InferenceExecutor:
+    """
+    Выполняет encode выбранного бэкенда (torch / onnx / onnx-int8) в отдельных потоках.
+    Параллельные запросы собираются в микро-батчи (не больше batch_size
+    текстов и не дольше max_wait_ms ожидания), результат возвращается
+    в event loop через asyncio.Future. Эмбеддинги всегда нормированы.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        threads: int = 1,
+        batch_size: int = 32,
+        max_wait_ms: int = 5,
+        backend: str = "torch",
+        onnx_file: str = "",
+    ) -> None:
+        self.model_name = model_name
+        self.backend = backend
+        self.onnx_file = onnx_file
+        self.threads = max(1, threads)
+        self.batch_size = max(1, batch_size)
+        self.max_wait = max(0, max_wait_ms) / 1000
+        self._queue: queue.Queue[_EncodeJob] = queue.Queue()
+        self._model: EmbeddingBackend | None = None
+        self._model_lock = threading.Lock()
+        self._workers: list[threading.Thread] = []
+        self._start_lock = threading.Lock()
+
+    # ---------- потоки ----------
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._workers:
+                return
+            for i in range(self.threads):
+                worker = threading.Thread(
+                    target=self._run, name=f"inference-{i}", daemon=True
+                )
+                worker.start()
+                self._workers.append(worker)
+            logger.info(f"🧠 Inference executor запущен: {self.threads} поток(ов)")
+
+    def get_model(self) -> EmbeddingBackend:
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    self._model = make_backend(self.backend, self.model_name, self.onnx_file)
+                    logger.info(f"🧠 Бэкенд эмбеддингов: {self._model.name}")
+        return self._model
+
+    def _collect_batch(self) -> list[_EncodeJob]:
+        jobs = [self._queue.get()]
+        size = len(jobs[0].texts)
+        deadline = time.monotonic() + self.max_wait
+
+        while size < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                job = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            jobs.append(job)
+            size += len(job.texts)
+        return jobs
+
+    def _run(self) -> None:
+        while True:
+            jobs = self._collect_batch()
+            texts = [text for job in jobs for text in job.texts]
+            try:
+                model = self.get_model()
+                embeddings = model.encode(texts, batch_size=self.batch_size)
+            except Exception as e:
+                logger.error(f"❌ Ошибка encode для батча из {len(texts)} текстов: {e}")
+                for job in jobs:
+                    job.loop.call_soon_threadsafe(_set_exception, job.future, e)
+                continue
+
+            offset = 0
+            for job in jobs:
+                result = embeddings[offset : offset + len(job.texts)]
+                offset += len(job.texts)
+                job.loop.call_soon_threadsafe(_set_result, job.future, result)
+
+    # ---------- публичный API ----------
+
+    async def encode_many(self, texts: list[str]) -> np.ndarray:
+        """Матрица нормированных эмбеддингов (len(texts) × dim)."""
+        self.start()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put(_EncodeJob(texts=list(texts), future=future, loop=loop))
+        return await future
+
+    async def encode(self, text: str) -> np.ndarray:
+        """Нормированный эмбеддинг одного текста."""
+        embeddings = await self.encode_many([text])
+        return embeddings[0]
+
+
+def _set_result(future: asyncio.Future, result) -> None:
+    if not future.done():
+        future.set_result(result)
+
+
+def _set_exception(future: asyncio.Future, error: Exception) -> None:
+    if not future.done():
+        future.set_exception(error)
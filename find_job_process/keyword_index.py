@@ -0,0 +1,146 @@
+# keyword_index.py
+import logging
+import re
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# pymorphy2 не работает на Python 3.11+, поэтому в первую очередь берём
+# совместимый форк pymorphy3; без морфологии ищем по словоформам как есть
+try:
+    import pymorphy3 as _pymorphy
+except ImportError:
+    try:
+        import pymorphy2 as _pymorphy
+    except ImportError:
+        _pymorphy = None
+
+WORD_RE = re.compile(r"\w+")
+
+_morph = None
+
+
+def get_morph():
+    global _morph
+    if _morph is None and _pymorphy is not None:
+        _morph = _pymorphy.MorphAnalyzer()
+    return _morph
+
+
+@lru_cache(maxsize=100_000)
+def lemmatize(word: str) -> str:
+    """Нормальная форма слова (кэшируется: словарь слов в вакансиях ограничен)."""
+    morph = get_morph()
+    if morph is None:
+        return word
+    try:
+        return morph.parse(word)[0].normal_form
+    except Exception:
+        return word
+
+
+def tokenize(text: str) -> list[str]:
+    return WORD_RE.findall(text.lower())
+
+
+def lemmas(text: str) -> list[str]:
+    return [lemmatize(token) for token in tokenize(text)]
+
+
+class KeywordIndex:
+    """
+    Инвертированный индекс ключевых слов профессий:
+    кортеж лемм фразы -> [(профессия, вес), ...].
+    Оценка текста — один проход токенизации и лемматизации
+    плюс поиск окон нужной длины в индексе.
+
+    Ключевые слова, введённые основой или частью слова («разработ»,
+    «дизайн»), раньше находились подстрокой в «разработчик», «дизайнер».
+    Чтобы они не перестали работать, фраза засчитывается и тогда, когда
+    каждое её слово — начало соответствующего слова текста.
+    """
+
+    def __init__(self) -> None:
+        self.postings: dict[tuple[str, ...], list[tuple[str, float]]] = {}
+        # ключевые слова со спецсимволами (c++, 1с:бухгалтерия и т.п.),
+        # которые нельзя честно разбить на слова, проверяем подстрокой
+        self.raw_keywords: list[tuple[str, str, float]] = []
+        # первое слово фразы как написано -> [(слова фразы, кортеж лемм)]
+        self.prefixes: dict[str, list[tuple[tuple[str, ...], tuple[str, ...]]]] = {}
+        self.prefix_lengths: list[int] = []
+        self.phrase_lengths: list[int] = []
+        self.professions: list[str] = []
+
+    @classmethod
+    def build(cls, professions: dict[str, dict]) -> "KeywordIndex":
+        index = cls()
+        index.professions = list(professions.keys())
+        lengths = set()
+        prefix_lengths = set()
+
+        for name, data in professions.items():
+            for kw, weight in data.get("keywords", {}).items():
+                kw_lower = (kw or "").strip().lower()
+                tokens = tokenize(kw_lower)
+                if not tokens:
+                    continue
+
+                if re.sub(r"[\s\-/]+", " ", kw_lower) != " ".join(tokens):
+                    index.raw_keywords.append((kw_lower, name, weight))
+                    continue
+
+                phrase = tuple(lemmatize(token) for token in tokens)
+                if phrase not in index.postings:
+                    index.prefixes.setdefault(tokens[0], []).append((tuple(tokens), phrase))
+                    prefix_lengths.add(len(tokens[0]))
+                index.postings.setdefault(phrase, []).append((name, weight))
+                lengths.add(len(phrase))
+
+        index.phrase_lengths = sorted(lengths)
+        index.prefix_lengths = sorted(prefix_lengths)
+        logger.info(
+            f"Индекс ключевых слов построен: {len(index.postings)} фраз, "
+            f"{len(index.raw_keywords)} по подстроке"
+        )
+        return index
+
+    def score(self, text: str) -> dict[str, float]:
+        """Возвращает {профессия: сумма весов найденных ключевых слов}."""
+        keyword_scores = {name: 0 for name in self.professions}
+        if not self.postings and not self.raw_keywords:
+            return keyword_scores
+
+        text_tokens = tokenize(text)
+        text_lemmas = [lemmatize(token) for token in text_tokens]
+        found = set()
+        for n in self.phrase_lengths:
+            for i in range(len(text_lemmas) - n + 1):
+                phrase = tuple(text_lemmas[i : i + n])
+                if phrase in self.postings:
+                    found.add(phrase)
+
+        # основы и части слов: каждое слово фразы — начало слова текста
+        for i, token in enumerate(text_tokens):
+            for length in self.prefix_lengths:
+                if length > len(token):
+                    break
+                for words, phrase in self.prefixes.get(token[:length], ()):
+                    if phrase in found or i + len(words) > len(text_tokens):
+                        continue
+                    if all(
+                        text_tokens[i + j].startswith(word) for j, word in enumerate(words[1:], 1)
+                    ):
+                        found.add(phrase)
+
+        # как и раньше, каждое ключевое слово учитывается один раз
+        for phrase in found:
+            for name, weight in self.postings[phrase]:
+                keyword_scores[name] += weight
+
+        if self.raw_keywords:
+            lowered = text.lower()
+            for kw, name, weight in self.raw_keywords:
+                if kw in lowered:
+                    keyword_scores[name] += weight
+
+        return keyword_scores
@@ -0,0 +1,168 @@
+# near_duplicates.py
+import html
+import logging
+import re
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from config.config import load_config
+
+config = load_config()
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 64  # длина MinHash-сигнатуры
+BANDS = 16  # LSH: 16 полос по 4 значения
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3  # шинглы из трёх слов
+MIN_TOKENS = 8  # короткие тексты не сравниваем: слишком много ложных совпадений
+
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20251006)  # фиксированный seed: сигнатуры стабильны между рестартами
+_A = _rng.integers(1, _PRIME, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, _PRIME, NUM_PERM, dtype=np.uint64)
+
+TAG_RE = re.compile(r"<[^>]+>")
+URL_RE = re.compile(r"(https?://|www\.|t\.me/)\S+")
+WORD_RE = re.compile(r"\w+")
+
+
+def normalize_tokens(text: str) -> list[str]:
+    """
+    Нормализует текст вакансии для сравнения: убирает HTML-разметку,
+    ссылки, эмодзи и пунктуацию, приводит к нижнему регистру.
+    """
+    text = html.unescape(TAG_RE.sub(" ", text or "")).lower()
+    text = URL_RE.sub(" ", text)
+    return WORD_RE.findall(text)
+
+
+def minhash_signature(text: str) -> np.ndarray | None:
+    tokens = normalize_tokens(text)
+    if len(tokens) < MIN_TOKENS:
+        return None
+
+    shingles = {
+        " ".join(tokens[i : i + SHINGLE_SIZE])
+        for i in range(len(tokens) - SHINGLE_SIZE + 1)
+    }
+    hashes = np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) for s in shingles),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+    return ((np.outer(_A, hashes) + _B[:, None]) % _PRIME).min(axis=1)
+
+
+def _bands(signature: np.ndarray) -> list[tuple[int, bytes]]:
+    return [
+        (band, signature[band * ROWS : (band + 1) * ROWS].tobytes())
+        for band in range(BANDS)
+    ]
+
+
+@dataclass
+class NearDuplicate:
+    key: str
+    decision: str  # "vacancy" или "trash"
+    similarity: float
+
+
+@dataclass
+class _Entry:
+    signature: np.ndarray
+    decision: str
+    created_at: datetime
+
+
+class NearDuplicateIndex:
+    """
+    Индекс почти-дубликатов вакансий: MinHash по шинглам нормализованного
+    текста и LSH-корзины. Хранит решения (вакансия / корзина) за последние
+    max_age_days дней, чтобы репост с другим эмодзи или ссылкой
+    не проходил заново через эмбеддинги, DeepSeek и рассылку.
+    """
+
+    def __init__(self, threshold: float = 0.8, max_age_days: int = 3) -> None:
+        self.threshold = threshold
+        self.max_age = timedelta(days=max_age_days)
+        self._entries: dict[str, _Entry] = {}
+        self._buckets: dict[tuple[int, bytes], set[str]] = {}
+        self._last_prune = datetime.now(timezone.utc)
+        self.hits = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(
+        self,
+        key: str,
+        text: str,
+        decision: str,
+        created_at: datetime | None = None,
+        signature: np.ndarray | None = None,
+    ) -> None:
+        if not key or key in self._entries:
+            return
+        if signature is None:
+            signature = minhash_signature(text)
+        if signature is None:
+            return
+
+        created_at = created_at or datetime.now(timezone.utc)
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+
+        self._entries[key] = _Entry(signature, decision, created_at)
+        for band in _bands(signature):
+            self._buckets.setdefault(band, set()).add(key)
+
+        self._maybe_prune()
+
+    def remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for band in _bands(entry.signature):
+            bucket = self._buckets.get(band)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band]
+
+    def find(self, text: str) -> NearDuplicate | None:
+        signature = minhash_signature(text)
+        if signature is None:
+            return None
+
+        candidates = set()
+        for band in _bands(signature):
+            candidates |= self._buckets.get(band, set())
+
+        best = None
+        for key in candidates:
+            entry = self._entries[key]
+            similarity = float(np.mean(entry.signature == signature))
+            if similarity >= self.threshold and (best is None or similarity > best.similarity):
+                best = NearDuplicate(key, entry.decision, similarity)
+
+        if best is not None:
+            self.hits += 1
+        return best
+
+    def _maybe_prune(self) -> None:
+        now = datetime.now(timezone.utc)
+        if now - self._last_prune < timedelta(hours=1):
+            return
+        self._last_prune = now
+        cutoff = now - self.max_age
+        for key in [k for k, e in self._entries.items() if e.created_at < cutoff]:
+            self.remove(key)
+
+
+near_duplicate_index = NearDuplicateIndex(
+    threshold=config.parser.near_dup_threshold,
+    max_age_days=config.parser.near_dup_days,
+)
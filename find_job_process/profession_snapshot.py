@@ -0,0 +1,97 @@
+# profession_snapshot.py
+import hashlib
+import json
+import logging
+import os
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+
+def profession_key(model_name: str, desc: str) -> str:
+    """Ключ эмбеддинга описания: хэш имени модели и текста описания."""
+    return hashlib.sha256(f"{model_name}\0{desc}".encode("utf-8")).hexdigest()
+
+
+def _file_digest(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class ProfessionSnapshot:
+    """
+    Снимок эмбеддингов описаний профессий на диске:
+    vectors.npy (n × dim, float32, читается через mmap) и index.json
+    со списком ключей по строкам. При старте и после правок в админке
+    перекодируются только описания, которых нет в снимке.
+    """
+
+    def __init__(self, path: str, model_name: str) -> None:
+        self.path = path
+        self.model_name = model_name
+        self.vectors_path = os.path.join(path, "vectors.npy")
+        self.index_path = os.path.join(path, "index.json")
+        self._vectors: dict[str, np.ndarray] | None = None
+
+    def key(self, desc: str) -> str:
+        return profession_key(self.model_name, desc)
+
+    def load(self) -> dict[str, np.ndarray]:
+        if self._vectors is not None:
+            return self._vectors
+
+        self._vectors = {}
+        if not (os.path.exists(self.vectors_path) and os.path.exists(self.index_path)):
+            return self._vectors
+
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("version") != SNAPSHOT_VERSION or index.get("model") != self.model_name:
+                logger.info("Снимок эмбеддингов профессий устарел, будет пересобран")
+                return self._vectors
+
+            # файлы меняются двумя os.replace: сверяем, что индекс от этих векторов
+            if index.get("digest") != _file_digest(self.vectors_path):
+                logger.info("Снимок эмбеддингов профессий повреждён, будет пересобран")
+                return self._vectors
+
+            matrix = np.load(self.vectors_path, mmap_mode="r")
+            self._vectors = {
+                key: np.array(matrix[row]) for row, key in enumerate(index["keys"])
+            }
+            logger.info(f"💾 Снимок эмбеддингов профессий загружен: {len(self._vectors)}")
+        except Exception as e:
+            logger.error(f"❌ Не удалось прочитать снимок эмбеддингов профессий: {e}")
+            self._vectors = {}
+        return self._vectors
+
+    def save(self, vectors: dict[str, np.ndarray]) -> None:
+        """Атомарно перезаписывает снимок (через временные файлы и os.replace)."""
+        self._vectors = dict(vectors)
+        if not vectors:
+            return
+
+        os.makedirs(self.path, exist_ok=True)
+        keys = list(vectors.keys())
+        matrix = np.stack([vectors[key] for key in keys]).astype(np.float32)
+
+        tmp_vectors = self.vectors_path + ".tmp"
+        tmp_index = self.index_path + ".tmp"
+        with open(tmp_vectors, "wb") as f:
+            np.save(f, matrix)
+        with open(tmp_index, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": SNAPSHOT_VERSION,
+                    "model": self.model_name,
+                    "digest": _file_digest(tmp_vectors),
+                    "keys": keys,
+                },
+                f,
+            )
+        os.replace(tmp_vectors, self.vectors_path)
+        os.replace(tmp_index, self.index_path)
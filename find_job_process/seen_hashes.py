@@ -0,0 +1,86 @@
+# seen_hashes.py
+import logging
+import math
+
+import numpy as np
+
+from config.config import load_config
+
+config = load_config()
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """
+    Фильтр Блума по sha256-хэшам текстов (hex). Позиции битов берутся
+    из самого хэша (двойное хеширование), поэтому дополнительного
+    хеширования нет. Ложноотрицательных ответов не бывает.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001) -> None:
+        self.capacity = max(1, capacity)
+        self.size = max(64, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self._bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        self.count = 0
+
+    def _positions(self, text_hash: str) -> np.ndarray:
+        h1 = int(text_hash[:16], 16)
+        h2 = int(text_hash[16:32], 16) | 1
+        return np.array(
+            [(h1 + i * h2) % self.size for i in range(self.hashes)], dtype=np.int64
+        )
+
+    def add(self, text_hash: str) -> None:
+        positions = self._positions(text_hash)
+        np.bitwise_or.at(self._bits, positions >> 3, (1 << (positions & 7)).astype(np.uint8))
+        self.count += 1
+
+    def __contains__(self, text_hash: str) -> bool:
+        positions = self._positions(text_hash)
+        return bool(np.all(self._bits[positions >> 3] & (1 << (positions & 7))))
+
+
+class SeenHashes:
+    """
+    Хэши всех вакансий и корзины в памяти процесса. Пока фильтр
+    не загружен, любой хэш считается «возможно известным» — решение
+    остаётся за БД. Удаления фильтр не отражает: удалённый хэш даёт
+    лишний запрос в БД, но не ошибку.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._filter: BloomFilter | None = None
+        self.definitely_new = 0
+        self.possible_hits = 0
+
+    def load(self, hashes: list[str]) -> None:
+        # запас на рост до следующего рестарта
+        bloom = BloomFilter(max(self.capacity, 2 * len(hashes)), self.error_rate)
+        for text_hash in hashes:
+            if text_hash:
+                bloom.add(text_hash)
+        self._filter = bloom
+        logger.info(
+            f"🌸 Фильтр хэшей загружен: {len(hashes)} хэшей, "
+            f"{bloom.size // 8 // 1024} КБ, {bloom.hashes} хеш-функций"
+        )
+
+    def add(self, text_hash: str) -> None:
+        if self._filter is None or not text_hash:
+            return
+        self._filter.add(text_hash)
+        if self._filter.count == self._filter.capacity:
+            logger.warning("⚠️ Фильтр хэшей заполнен, доля ложных срабатываний будет расти")
+
+    def might_contain(self, text_hash: str) -> bool:
+        if self._filter is None or text_hash in self._filter:
+            self.possible_hits += 1
+            return True
+        self.definitely_new += 1
+        return False
+
+
+seen_hashes = SeenHashes(capacity=config.parser.seen_hashes_capacity)
@@ -0,0 +1,90 @@
+# stopword_matcher.py
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+
+def _trie_to_pattern(node: dict) -> str:
+    """
+    Рекурсивно превращает префиксное дерево в регулярное выражение
+    с вынесенными общими префиксами: ["python", "pyqt"] -> "py(?:thon|qt)".
+    Такой шаблон проверяет каждую позицию текста за один проход по дереву,
+    а не перебирает все стоп-слова подряд.
+    """
+    is_end = "" in node
+    branches = [
+        re.escape(char) + _trie_to_pattern(child)
+        for char, child in sorted(node.items())
+        if char != ""
+    ]
+
+    if not branches:
+        return ""
+
+    if len(branches) == 1 and not is_end:
+        return branches[0]
+
+    # Длинные ветки идут первыми, чтобы совпадение было максимальным
+    branches.sort(key=len, reverse=True)
+    pattern = "(?:" + "|".join(branches) + ")"
+    if is_end:
+        pattern += "?"
+    return pattern
+
+
+def build_stopword_pattern(words) -> re.Pattern | None:
+    """Собирает один скомпилированный шаблон по всем стоп-словам."""
+    trie: dict = {}
+    for word in words:
+        word = (word or "").strip().lower()
+        if not word:
+            continue
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    if not trie:
+        return None
+    return re.compile(_trie_to_pattern(trie))
+
+
+class StopwordMatcher:
+    """
+    Кэш скомпилированного шаблона стоп-слов.
+    Шаблон строится один раз и пересобирается только после изменения
+    набора стоп-слов (см. db_add_stopword / db_delete_stopword).
+    """
+
+    def __init__(self) -> None:
+        self._pattern: re.Pattern | None = None
+        self._words: frozenset[str] = frozenset()
+        self.version = 0
+        self.is_stale = True
+
+    def build(self, words) -> None:
+        words = frozenset(w.strip().lower() for w in words if w and w.strip())
+        # Присваиваем атомарно: параллельные проверки видят либо старый, либо новый шаблон
+        self._pattern = build_stopword_pattern(words)
+        self._words = words
+        self.version += 1
+        self.is_stale = False
+        logger.info(f"Шаблон стоп-слов пересобран: {len(words)} слов, версия {self.version}")
+
+    def invalidate(self) -> None:
+        self.is_stale = True
+
+    @property
+    def words(self) -> frozenset[str]:
+        return self._words
+
+    def find(self, text: str) -> list[str]:
+        """Возвращает уникальные стоп-слова, найденные в тексте."""
+        pattern = self._pattern
+        if pattern is None or not text:
+            return []
+        return list(set(pattern.findall(text.lower())))
+
+
+stopword_matcher = StopwordMatcher()
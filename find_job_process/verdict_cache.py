@@ -0,0 +1,166 @@
+# verdict_cache.py
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+
+from nats.js.api import KeyValueConfig
+from nats.js.errors import KeyNotFoundError
+from nats.js.kv import KeyValue
+
+from config.config import load_config
+from find_job_process.near_duplicates import normalize_tokens
+from utils.nats_connect import get_nats_connection
+
+config = load_config()
+logger = logging.getLogger(__name__)
+
+VERDICT_BUCKET = "llm_verdicts"
+
+
+def normalized_text_hash(text: str) -> str:
+    """sha256 нормализованного текста: разметка, ссылки, эмодзи и регистр не влияют на ключ."""
+    return hashlib.sha256(" ".join(normalize_tokens(text)).encode("utf-8")).hexdigest()
+
+
+def profession_fingerprint(name: str, desc: str, keywords: dict[str, float]) -> str:
+    """Отпечаток профессии: меняется при любой правке описания или ключевых слов."""
+    payload = json.dumps([name, desc or "", sorted(keywords.items())], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class VerdictCache:
+    """
+    Кэш решений DeepSeek по паре (нормализованный текст, профессия).
+    Общий для всех процессов слой — NATS KV с TTL, перед ним LRU в памяти.
+    В ключ входит отпечаток профессии, поэтому после правки описания
+    или ключевых слов старые решения просто перестают находиться.
+    """
+
+    def __init__(self, ttl_hours: float = 72, memory_size: int = 20000) -> None:
+        self.ttl = ttl_hours * 3600
+        self.memory_size = memory_size
+        # ключ -> (решение, время истечения)
+        self._memory: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._fingerprints: dict[str, str] = {}
+        self._kv: KeyValue | None = None
+        self._kv_lock = asyncio.Lock()
+
+        self.hits = 0
+        self.kv_hits = 0
+        self.misses = 0
+
+    def set_fingerprints(self, fingerprints: dict[str, str]) -> None:
+        """Вызывается при загрузке профессий; выбрасывает из памяти решения по изменённым."""
+        self._fingerprints = dict(fingerprints)
+        current = set(fingerprints.values())
+        stale = [key for key in self._memory if key.rsplit(".", 1)[1] not in current]
+        for key in stale:
+            del self._memory[key]
+        if stale:
+            logger.info(f"🧹 Кэш решений DeepSeek: сброшено {len(stale)} устаревших записей")
+
+    def _key(self, text_hash: str, proff: str) -> str | None:
+        fingerprint = self._fingerprints.get(proff)
+        if fingerprint is None:
+            return None
+        return f"{text_hash}.{fingerprint}"
+
+    async def _get_kv(self) -> KeyValue:
+        async with self._kv_lock:
+            if self._kv is None:
+                _, js = await get_nats_connection()
+                self._kv = await js.create_key_value(
+                    config=KeyValueConfig(
+                        bucket=VERDICT_BUCKET,
+                        history=1,
+                        ttl=self.ttl,
+                        storage="file",
+                    )
+                )
+            return self._kv
+
+    def _remember(self, key: str, verdict: str, expires_at: float) -> None:
+        self._memory[key] = (verdict, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    async def _get_remote(self, kv: KeyValue, key: str) -> tuple[str, float] | None:
+        try:
+            entry = await kv.get(key)
+        except KeyNotFoundError:
+            return None
+        data = json.loads(entry.value.decode())
+        return data["verdict"], data["time"] + self.ttl
+
+    async def get_many(self, text_hash: str, proffs: list[str]) -> dict[str, str]:
+        """Возвращает {профессия: "0" | "1"} только для найденных в кэше пар."""
+        now = time.time()
+        found: dict[str, str] = {}
+        remote: dict[str, str] = {}
+
+        for proff in proffs:
+            key = self._key(text_hash, proff)
+            if key is None:
+                continue
+            cached = self._memory.get(key)
+            if cached and cached[1] > now:
+                self._memory.move_to_end(key)
+                found[proff] = cached[0]
+            else:
+                remote[proff] = key
+
+        if remote:
+            try:
+                kv = await self._get_kv()
+                results = await asyncio.gather(
+                    *(self._get_remote(kv, key) for key in remote.values())
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ Кэш решений DeepSeek в NATS KV недоступен: {e}")
+                results = [None] * len(remote)
+
+            for (proff, key), cached in zip(remote.items(), results):
+                if cached and cached[1] > now:
+                    self._remember(key, *cached)
+                    found[proff] = cached[0]
+                    self.kv_hits += 1
+
+        self.hits += len(found)
+        self.misses += len(proffs) - len(found)
+        return found
+
+    async def put_many(self, text_hash: str, verdicts: dict[str, str]) -> None:
+        now = time.time()
+        items = {}
+        for proff, verdict in verdicts.items():
+            key = self._key(text_hash, proff)
+            if key is None or verdict not in ("0", "1"):
+                continue
+            self._remember(key, verdict, now + self.ttl)
+            items[key] = json.dumps({"verdict": verdict, "time": now}).encode()
+
+        if not items:
+            return
+        try:
+            kv = await self._get_kv()
+            await asyncio.gather(*(kv.put(key, value) for key, value in items.items()))
+        except Exception as e:
+            logger.warning(f"⚠️ Не удалось сохранить решения DeepSeek в NATS KV: {e}")
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "kv_hits": self.kv_hits,
+            "misses": self.misses,
+            "size": len(self._memory),
+        }
+
+
+verdict_cache = VerdictCache(
+    ttl_hours=config.deepseek.verdict_ttl_hours,
+    memory_size=config.deepseek.verdict_cache_size,
+)
@@ -2,6 +2,7 @@ import gspread
 import os
 import json
 import asyncio
+import threading
 from google.oauth2.service_account import Credentials
 from config.config import load_config
 from datetime import datetime
@@ -17,18 +18,31 @@ SCOPE = [
     "https://www.googleapis.com/auth/drive",
 ]
 
-google_creds = config.google.api_key
-google_creds_dict = json.loads(google_creds)
+_lock = threading.Lock()
+_worksheets: list | None = None
 
-CREDS = Credentials.from_service_account_info(google_creds_dict, scopes=SCOPE)
-client = gspread.authorize(CREDS)
 
+def get_worksheets() -> list:
+    """
+    Авторизация в gspread и открытие таблицы — сетевые вызовы, поэтому
+    выполняются при первой записи (в потоке), а не при импорте модуля.
+    """
+    global _worksheets
+    with _lock:
+        if _worksheets is None:
+            creds = Credentials.from_service_account_info(
+                json.loads(config.google.api_key), scopes=SCOPE
+            )
+            spreadsheet = gspread.authorize(creds).open("proonlinejob-bot")
+            _worksheets = [spreadsheet.get_worksheet(i) for i in range(4)]
+        return _worksheets
 
-spreadsheet = client.open("proonlinejob-bot")
-worksheet_first = spreadsheet.sheet1
-worksheet_second = spreadsheet.get_worksheet(1)
-worksheet_third = spreadsheet.get_worksheet(2)
-worksheet_fourth = spreadsheet.get_worksheet(3)
+
+async def append_row(sheet: int, row: list) -> None:
+    def run():
+        get_worksheets()[sheet].append_row(row)
+
+    await asyncio.to_thread(run)
 
 
 async def worksheet_append_row(
@@ -43,37 +57,20 @@ async def worksheet_append_row(
     profession=None,
 ):
     if action == "delete_vacancy":
-        await asyncio.to_thread(
-            worksheet_first.append_row,
-            [user_id, time, name, text, vacancy_text],
-        )
+        await append_row(0, [user_id, time, name, text, vacancy_text])
     elif action == "add_stopword":
-        await asyncio.to_thread(
-            worksheet_second.append_row, [user_id, time, name, text, stopword]
-        )
+        await append_row(1, [user_id, time, name, text, stopword])
     elif action == "delete_stopword":
-        await asyncio.to_thread(
-            worksheet_second.append_row, [user_id, time, name, text, stopword]
-        )
+        await append_row(1, [user_id, time, name, text, stopword])
     elif action == "add_keyword":
-        await asyncio.to_thread(
-            worksheet_third.append_row,
-            [user_id, time, name, text, keyword, profession],
-        )
+        await append_row(2, [user_id, time, name, text, keyword, profession])
     elif action == "delete_keyword":
-        await asyncio.to_thread(
-            worksheet_third.append_row,
-            [user_id, time, name, text, keyword, profession],
-        )
+        await append_row(2, [user_id, time, name, text, keyword, profession])
         
         
 async def worksheet_append_log(name, action, user_id=None, time=None, text=None, text2=None):
-    await asyncio.to_thread(
-        worksheet_third.append_row, [user_id, time, name, action, text, text2]
-    )
+    await append_row(2, [user_id, time, name, action, text, text2])
     
     
 async def worksheet_append_error(action, name=None, user_id=None, time=None, text=None, text2=None):
-    await asyncio.to_thread(
-        worksheet_fourth.append_row, [user_id, time, name, action, text, text2]
-    )
\ No newline at end of file
+    await append_row(3, [user_id, time, name, action, text, text2])
\ No newline at end of file
@@ -31,12 +31,25 @@ from bot.handlers import get_routers
 from parser.parser_bot import main as parser_main
 
 from db.database import Sessionmaker
-from db.requests import set_new_days, update_user_is_pay_status, load_stopwords
+from db.requests import (
+    set_new_days,
+    update_user_is_pay_status,
+    load_stopwords,
+    load_known_hashes,
+)
 from parser.tg_worker import vacancy_worker
 from parser.hh_worker import hh_vacancy_worker
+from parser.prefilter import ingest_filter
 from google_logs.google_log import worksheet_append_log
 
-from find_job_process.find_job import load_professions, load_stop_embeddings
+from find_job_process.classifier_config import watch_classifier_updates
+from find_job_process.distilled import distilled_training_loop
+from find_job_process.find_job import (
+    load_professions,
+    load_stop_embeddings,
+    load_near_duplicates,
+    embedding_cache,
+)
 
 from bot.background_tasks.check_subscriptions import start_all_schedulers
 from bot.background_tasks.broker import schedule_source
@@ -110,6 +123,17 @@ def create_app(config: Config) -> FastAPI:
         await bot.set_webhook(config.bot.webhook_url, drop_pending_updates=True)
         logger.info(f"Webhook set to {config.bot.webhook_url}")
 
+        # Списки предфильтра нужны юзерботу с первого сообщения —
+        # загружаем их до запуска парсера
+        await load_stopwords()
+        logger.info("Stopwords loaded")
+
+        await load_known_hashes()
+        logger.info("Known hashes filter loaded")
+
+        await ingest_filter.load()
+        logger.info("Ingest prefilter chat lists loaded")
+
         # Запускаем парсер
         asyncio.create_task(parser_main())
         logger.info("Parser started")
@@ -118,11 +142,11 @@ def create_app(config: Config) -> FastAPI:
         await load_professions()
         logger.info("Professions loaded")
         
-        load_stop_embeddings()
+        await load_stop_embeddings()
         logger.info("Stop-embedding loaded")
 
-        await load_stopwords()
-        logger.info("Stopwords loaded")
+        await load_near_duplicates()
+        logger.info("Near-duplicate index loaded")
 
         # Запускаем планировщик задач
         start_all_schedulers()
@@ -138,6 +162,8 @@ def create_app(config: Config) -> FastAPI:
         asyncio.create_task(vacancy_worker(js))
         asyncio.create_task(hh_vacancy_worker(js))
         asyncio.create_task(bot_send_messages_worker(js))
+        asyncio.create_task(watch_classifier_updates(js))
+        asyncio.create_task(distilled_training_loop())
         logger.info("Vacancy worker started")
         
         await schedule_source.startup()
@@ -147,6 +173,7 @@ def create_app(config: Config) -> FastAPI:
         yield
 
         # --- Shutdown ---
+        embedding_cache.flush()
         await bot.delete_webhook()
         await bot.session.close()
         await nc.close()
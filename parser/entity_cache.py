@@ -0,0 +1,164 @@
+# entity_cache.py
+"""
+Кэш сущностей Telegram для юзербота.
+
+Одно входящее сообщение раньше давало несколько одинаковых запросов:
+get_sender в on_new_message, в MessagePayload.from_telethon и в
+extract_sender_info, плюс get_entity для from_id, peer_id и источника
+пересылки. Теперь все они идут через общий TTL/LRU-кэш по id пира:
+
+- сущности, уже пришедшие в апдейте (message.sender, forward.chat),
+  кладутся в кэш без запросов;
+- неразрешимые пиры запоминаются на короткое время (негативный кэш);
+- одновременные запросы одного id объединяются в один вызов API.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+
+from telethon import utils
+from telethon.errors import FloodWaitError
+
+from config.config import load_config
+from parser.rate_governor import rate_governor
+from parser.telethon_client import app
+
+config = load_config()
+logger = logging.getLogger(__name__)
+
+
+class EntityCache:
+    def __init__(self, client, ttl: float, negative_ttl: float, max_size: int) -> None:
+        self.client = client
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_size = max_size
+        self._entries: OrderedDict[int, tuple[float, object | None]] = OrderedDict()
+        self._pending: dict[int, asyncio.Future] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.negative = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def key(peer) -> int | None:
+        try:
+            return utils.get_peer_id(peer)
+        except Exception:
+            return None
+
+    def _store(self, key: int, entity, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, entity)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def put(self, entity) -> None:
+        """Кладёт в кэш сущность, пришедшую вместе с апдейтом."""
+        # min-сущности приходят без username и access_hash — такие
+        # запрашиваем заново, чтобы не закэшировать неполные данные
+        if entity is None or getattr(entity, "min", False):
+            return
+        key = self.key(entity)
+        if key is not None:
+            self._store(key, entity, self.ttl)
+
+    async def get(self, peer):
+        """Сущность по id или Peer; None, если пир не разрешается."""
+        key = self.key(peer)
+        if key is None:
+            return None
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, entity = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entity
+            del self._entries[key]
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            entity = await rate_governor.call("get_entity", self.client.get_entity, peer)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except FloodWaitError as e:
+            # не пир неразрешим, а лимит: в негативный кэш не кладём
+            logger.warning(f"⚠️ FloodWait {e.seconds} с при получении сущности {key}")
+            entity = None
+        except Exception as e:
+            logger.debug(f"Сущность {key} не разрешается: {e}")
+            self.negative += 1
+            self._store(key, None, self.negative_ttl)
+            entity = None
+        else:
+            self._store(key, entity, self.ttl)
+        finally:
+            self._pending.pop(key, None)
+        future.set_result(entity)
+        return entity
+
+    async def input_peer(self, peer):
+        """
+        InputPeer для запросов (форвард и т.п.): из закэшированной сущности,
+        затем из сессии Telethon (обычно без сети, поэтому без лимита),
+        и только если сессия пира не знает — get_entity через rate_governor.
+        """
+        key = self.key(peer)
+        entry = self._entries.get(key) if key is not None else None
+        if entry is not None and entry[1] is not None:
+            try:
+                return utils.get_input_peer(entry[1])
+            except TypeError:
+                pass
+        try:
+            return await self.client.get_input_entity(peer)
+        except ValueError:
+            pass  # в сессии нет access_hash — нужен запрос к Telegram
+
+        entity = await self.get(peer)
+        if entity is None:
+            raise ValueError(f"Не удалось получить InputPeer для {key}")
+        return utils.get_input_peer(entity)
+
+    async def get_sender(self, message):
+        """
+        Отправитель сообщения: из самого апдейта, если Telethon его уже
+        разобрал, иначе через кэш по sender_id.
+        """
+        sender = getattr(message, "sender", None)
+        if sender is not None:
+            self.put(sender)
+            return sender
+        sender_id = getattr(message, "sender_id", None)
+        if sender_id is None:
+            return None
+        return await self.get(sender_id)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "negative": self.negative,
+            "coalesced": self.coalesced,
+        }
+
+
+entity_cache = EntityCache(
+    app,
+    ttl=config.parser.entity_cache_ttl,
+    negative_ttl=config.parser.entity_negative_ttl,
+    max_size=config.parser.entity_cache_size,
+)
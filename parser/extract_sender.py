@@ -1,6 +1,6 @@
 from telethon.tl.types import Message
 import logging
-from .telethon_client import app
+from .entity_cache import entity_cache
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +17,7 @@ async def extract_sender_info(message: Message):
         # 1️⃣ Пытаемся достать из message.get_sender()
         user = None
         try:
-            user = await message.get_sender()
+            user = await entity_cache.get_sender(message)
         except Exception as e:
             logger.debug(f"Не удалось получить sender: {e}")
 
@@ -25,11 +25,8 @@ async def extract_sender_info(message: Message):
             entity_username = getattr(user, "username", None)
             if not entity_username:
                 # Попытка получить entity напрямую, если username отсутствует
-                try:
-                    user_full = await app.get_entity(user.id)
-                    entity_username = getattr(user_full, "username", None)
-                except Exception as e:
-                    logger.debug(f"Не удалось обновить entity для {user.id}: {e}")
+                user_full = await entity_cache.get(user.id)
+                entity_username = getattr(user_full, "username", None)
 
             # Формируем имя
             if entity_username:
@@ -39,32 +36,27 @@ async def extract_sender_info(message: Message):
 
         # 2️⃣ Если get_sender() ничего не вернул — пробуем по from_id
         elif getattr(message, "from_id", None):
-            try:
-                entity = await app.get_entity(message.from_id)
-                entity_username = getattr(entity, "username", None)
-                if entity_username:
-                    entity_name = f"@{entity_username}"
-                else:
-                    entity_name = (
-                        getattr(entity, "first_name", None)
-                        or getattr(entity, "title", None)
-                        or "Неизвестный отправитель"
-                    )
-            except Exception as e:
-                logger.debug(f"Ошибка получения entity по from_id: {e}")
+            entity = await entity_cache.get(message.from_id)
+            entity_username = getattr(entity, "username", None)
+            if entity_username:
+                entity_name = f"@{entity_username}"
+            else:
+                entity_name = (
+                    getattr(entity, "first_name", None)
+                    or getattr(entity, "title", None)
+                    or "Неизвестный отправитель"
+                )
 
         # 3️⃣ Если и from_id нет — fallback на peer_id (чат/канал)
         elif getattr(message, "peer_id", None):
-            try:
-                peer = await app.get_entity(message.peer_id)
+            peer = await entity_cache.get(message.peer_id)
+            if peer is not None:
                 entity_username = getattr(peer, "username", None)
                 entity_name = (
                     f"@{entity_username}"
                     if entity_username
                     else getattr(peer, "title", "Неизвестный отправитель")
                 )
-            except Exception as e:
-                logger.debug(f"Ошибка получения entity по peer_id: {e}")
 
     except Exception as e:
         logger.warning(f"Ошибка получения отправителя: {e}")
@@ -82,32 +74,28 @@ async def extract_sender_info(message: Message):
             if getattr(forward, "sender", None):
                 fwd_user = forward.sender
                 fwd_username = getattr(fwd_user, "username", None)
+                entity_cache.put(fwd_user)
                 if not fwd_username:
-                    try:
-                        fwd_user_full = await app.get_entity(fwd_user.id)
-                        fwd_username = getattr(fwd_user_full, "username", None)
-                    except Exception:
-                        pass
+                    fwd_user_full = await entity_cache.get(fwd_user.id)
+                    fwd_username = getattr(fwd_user_full, "username", None)
                 fwd_name = getattr(fwd_user, "first_name", None) or "Неизвестный пользователь"
 
             # Если переслано от чата
             elif getattr(forward, "chat", None):
                 fwd_chat = forward.chat
+                entity_cache.put(fwd_chat)
                 fwd_username = getattr(fwd_chat, "username", None)
                 fwd_name = getattr(fwd_chat, "title", None) or "Неизвестный чат"
 
             # Если переслано через from_id (например, канал без sender/chat)
             elif getattr(forward, "from_id", None):
-                try:
-                    fwd_entity = await app.get_entity(forward.from_id)
-                    fwd_username = getattr(fwd_entity, "username", None)
-                    fwd_name = (
-                        getattr(fwd_entity, "first_name", None)
-                        or getattr(fwd_entity, "title", None)
-                        or "Неизвестный источник"
-                    )
-                except Exception:
-                    fwd_name = "Неизвестный источник"
+                fwd_entity = await entity_cache.get(forward.from_id)
+                fwd_username = getattr(fwd_entity, "username", None)
+                fwd_name = (
+                    getattr(fwd_entity, "first_name", None)
+                    or getattr(fwd_entity, "title", None)
+                    or "Неизвестный источник"
+                )
 
             # Финальный выбор приоритета
             if fwd_username:
@@ -0,0 +1,92 @@
+# forwarder.py
+"""
+Пересылка вакансий в канал по chat_id и id сообщения из MessagePayload.
+
+Сообщение заново не запрашивается (get_messages не нужен): forward_messages
+принимает id напрямую, а InputPeer источника берётся из кэша сущностей.
+
+Первая вакансия из чата пересылается сразу, без окна ожидания. Пока запрос
+по чату в пути (в том числе ждёт лимит forward в rate_governor), следующие
+вакансии из того же чата копятся и уходят одним forward_messages
+с несколькими id, когда он завершится.
+"""
+import asyncio
+import logging
+
+from config.config import load_config
+from parser.entity_cache import entity_cache
+from parser.rate_governor import rate_governor
+from parser.telethon_client import app
+
+config = load_config()
+logger = logging.getLogger(__name__)
+
+MAX_FORWARD_IDS = 100  # ограничение Telegram на один messages.forwardMessages
+
+
+def channel_link(chat_id: int, message_id: int) -> str:
+    return f"https://t.me/c/{str(chat_id)[4:]}/{message_id}"
+
+
+class Forwarder:
+    def __init__(self, client, target: int) -> None:
+        self.client = client
+        self.target = target
+        self._pending: dict[int, dict[int, asyncio.Future]] = {}
+        self._drains: dict[int, asyncio.Task] = {}
+
+        self.requests = 0
+        self.forwarded = 0
+
+    async def forward(self, chat_id: int, message_id: int) -> str | None:
+        """Ссылка на пересланное сообщение в канале или None при ошибке."""
+        batch = self._pending.setdefault(chat_id, {})
+        future = batch.get(message_id)
+        if future is None:
+            future = batch[message_id] = asyncio.get_running_loop().create_future()
+        if chat_id not in self._drains:
+            self._drains[chat_id] = asyncio.create_task(self._drain(chat_id))
+        return await asyncio.shield(future)
+
+    async def _drain(self, chat_id: int) -> None:
+        """Отправляет накопленное по чату, пока за время запроса приходят новые id."""
+        try:
+            while self._pending.get(chat_id):
+                batch = self._pending.pop(chat_id)
+                ids = sorted(batch)
+                for start in range(0, len(ids), MAX_FORWARD_IDS):
+                    chunk = {message_id: batch[message_id] for message_id in ids[start : start + MAX_FORWARD_IDS]}
+                    await self._send(chat_id, chunk)
+        finally:
+            self._drains.pop(chat_id, None)
+
+    async def _send(self, chat_id: int, batch: dict[int, asyncio.Future]) -> None:
+        ids = list(batch)
+        links: dict[int, str] = {}
+        try:
+            from_peer = await entity_cache.input_peer(chat_id)
+            self.requests += 1
+            forwarded = await rate_governor.call(
+                "forward",
+                self.client.forward_messages,
+                entity=self.target,
+                messages=ids,
+                from_peer=from_peer,
+            )
+            for message_id, message in zip(ids, forwarded):
+                if message is not None:
+                    links[message_id] = channel_link(message.chat_id, message.id)
+            self.forwarded += len(links)
+            logger.info(f"Переслано в канал {len(links)}/{len(ids)} сообщений из чата {chat_id}")
+        except Exception as e:
+            logger.error(f"Ошибка пересылки вакансий из чата {chat_id}: {e}")
+        finally:
+            for message_id, future in batch.items():
+                if not future.done():
+                    future.set_result(links.get(message_id))
+
+    def stats(self) -> dict[str, int]:
+        return {"requests": self.requests, "forwarded": self.forwarded}
+
+
+forwarder = Forwarder(app, target=config.bot.wacancy_chat_id)
@@ -50,8 +50,17 @@ async def hh_parser():
                     "message": formatted,
                     "profession": prof
                 }
-                await js.publish("hh.vacancy.queue", json.dumps(data).encode())
-                logger.info(f"📤 Отправлена вакансия из HH по профессии '{prof}' в очередь")
+                # id вакансии HH: повторная выдача в окне дедупликации
+                # отбрасывается самим JetStream
+                ack = await js.publish(
+                    "hh.vacancy.queue",
+                    json.dumps(data).encode(),
+                    headers={"Nats-Msg-Id": f"hh:{vac.get('id') or link}"},
+                )
+                if ack.duplicate:
+                    logger.info(f"🔁 Вакансия HH {vac.get('id')} уже была в очереди, пропускаем")
+                else:
+                    logger.info(f"📤 Отправлена вакансия из HH по профессии '{prof}' в очередь")
             except Exception as e:
                 logger.error(f"❌ Ошибка публикации задачи в NATS: {e}")
         
@@ -1,42 +1,59 @@
 import json
 import logging
 import asyncio
-from parser.parser_bot import process_message
-from parser.telethon_client import app
-from telethon.errors import MessageIdInvalidError
-from schemas.message_payload import MessagePayload
+from config.config import load_config
+from parser.parser_bot import prepare_hh_message, publish_job
+from parser.pipeline import Pipeline, Stage
 
-MAX_RETRIES = 3  # Максимальное количество попыток для одной задачи
+config = load_config()
 logger = logging.getLogger(__name__)
 
+
+async def decode_hh_message(data: bytes):
+    data = json.loads(data.decode())
+    hh_message = data.get("message")
+    proffession = data.get("profession")
+
+    if not hh_message:
+        logger.warning("⚠️ Пустое сообщение HH, пропускаем")
+        return None
+    logger.info("📥 Получена HH-вакансия")
+    return await prepare_hh_message(hh_message, proffession)
+
+
+async def publish_hh_message(job):
+    await publish_job(job)
+    logger.info("✅ HH-вакансия успешно обработана")
+    return job
+
+
+# Вакансии HH уже привязаны к профессии: классификация и DeepSeek не нужны
+hh_pipeline = Pipeline(
+    "hh.vacancy.queue",
+    stages=[
+        Stage("decode", decode_hh_message, config.pipeline.decode_concurrency),
+        Stage("publish", publish_hh_message, config.pipeline.publish_concurrency),
+    ],
+    max_in_flight=config.pipeline.max_in_flight,
+    heartbeat_seconds=config.pipeline.heartbeat_seconds,
+)
+
+
 async def hh_vacancy_worker(js):
     sub_hh = await js.pull_subscribe("hh.vacancy.queue", durable="hh_vacancy_worker")
+    hh_pipeline.start()
 
-    logger.info("🚀 Воркер запущен и слушает очереди 'vacancy.queue' и 'hh.vacancy.queue'")
+    logger.info("🚀 Воркер запущен и слушает очередь 'hh.vacancy.queue'")
 
     while True:
+        batch = min(config.pipeline.fetch_batch, hh_pipeline.free_slots)
+        if batch == 0:
+            await asyncio.sleep(0.1)
+            continue
         try:
-            msgs_hh = await sub_hh.fetch(1, timeout=5)
+            msgs_hh = await sub_hh.fetch(batch, timeout=5)
         except Exception:
             msgs_hh = []
 
         for msg in msgs_hh:
-            try:
-                data = json.loads(msg.data.decode())
-                hh_message = data.get("message")
-                proffession = data.get("profession")
-
-                if hh_message:
-                    logger.info("📥 Получена HH-вакансия")
-                    await process_message(hh_message=hh_message, flag=proffession)
-                    await msg.ack()
-                    logger.info("✅ HH-вакансия успешно обработана")
-                else:
-                    logger.warning("⚠️ Пустое сообщение HH, пропускаем")
-                    await msg.ack()
-
-            except Exception as e:
-                logger.error(f"❌ Ошибка обработки HH-вакансии: {e}")
-                await msg.nak()
-
-        #await asyncio.sleep(0.5)  # небольшая пауза между циклами
\ No newline at end of file
+            await hh_pipeline.submit(msg, msg.data)
@@ -1,31 +1,37 @@
 from telethon import events
 import asyncio
-from find_job_process.find_job import find_job_func
-from DeepSeek.DS_proff_check import ai_proff_check
+from find_job_process.find_job import find_job_func, profession_features
+from find_job_process.distilled import distilled_classifier, log_training_samples
+from find_job_process.near_duplicates import near_duplicate_index
+from find_job_process.verdict_cache import verdict_cache, normalized_text_hash
+from find_job_process.gating import gating_policy
+from DeepSeek.DS_proff_check import ai_proff_check_batch
 from utils.bot_send_mes_queue import send_message
-import random
-from typing import Optional
-import re
+from dataclasses import dataclass, field
 import hashlib
 from config.config import load_config
 import logging
 from schemas.message_payload import MessagePayload
 from db.requests import (
-    get_vacancy_by_hash,
+    check_known_hash,
     save_vacancy_hash,
     record_vacancy_sent,
     save_in_trash,
-    is_in_trash,
     add_vac_point,
     update_vacancy_hash_admin_chat_url,
 )
-from schemas.message_payload import MessagePayload
+from schemas.message_payload import MessagePayload, get_full_text
 from utils.nats_connect import get_nats_connection
+from utils.recent_keys import RecentKeys
+from utils.tg_html import entities_to_html
 from find_job_process.job_dispatcher import send_vacancy_to_users
 from bot_setup import bot
 from bot.keyboards.admin_keyboard import get_delete_vacancy_kb
 from bot.lexicon.lexicon import LEXICON_PARSER
 from parser.telethon_client import app
+from parser.entity_cache import entity_cache
+from parser.forwarder import forwarder
+from parser.prefilter import ingest_filter
 
 EXCLUDED_CHAT_IDS = [-1003096281707, 7877140188, -4816957611]
 
@@ -39,7 +45,22 @@ logger = logging.getLogger(__name__)
 
 
 
-processed_messages = set()
+# Локальное окно последних сообщений: основную дедупликацию делает
+# JetStream по Nats-Msg-Id, здесь ловим повторные доставки в этом процессе
+processed_messages = RecentKeys(max_size=10000, ttl=config.nats.vacancy_dedup_window)
+
+# Хэши текстов, которые сейчас идут по конвейеру: одинаковый репост из двух
+# чатов не должен дважды дойти до DeepSeek и рассылки, пока первый не сохранён
+processing_hashes = RecentKeys(max_size=10000, ttl=600)
+
+
+def vacancy_msg_id(chat_id: int, message_id: int) -> str:
+    """Детерминированный Nats-Msg-Id сообщения Telegram."""
+    return f"{chat_id}:{message_id}"
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
 
 
@@ -55,195 +76,181 @@ def get_message_link(message):
     return "ссылка недоступна"
 
 
+@dataclass
+class VacancyJob:
+    """Состояние одной вакансии между стадиями конвейера."""
+    message_text: str
+    message_hash: str
+    html_text: str
+    original_link: str
+    payload: MessagePayload | None = None
+    flag: str | None = None
+    msg: object = None  # сообщение JetStream: ack/nak/in_progress
+    found_proffs: list[tuple[str, float]] = field(default_factory=list)
+    proffs: dict[str, float] = field(default_factory=dict)
+    link: str | None = None
+    sender_name: str = ""
+    fwd_info: str = ""
+    sender_link: str = ""
+
+    @property
+    def label(self) -> str:
+        return str(self.payload.id) if self.payload else f"HH ({self.flag})"
+
+
+async def prepare_tg_message(payload: MessagePayload) -> VacancyJob | None:
+    """Стадии decode/dedup: текст, хэш, проверка по БД и почти-дубликатам."""
+    # 1. Проверка дублей сообщений
+    if processed_messages.seen(vacancy_msg_id(payload.chat_id, payload.id)):
+        logger.info(f"Сообщение {payload.id} уже обработано, пропускаем.")
+        return None
+
+    # 2. Собираем текст
+    message_text = (payload.text or "").strip()
+    if not message_text:
+        logger.info(f"Сообщение {payload.id} пустое, пропускаем.")
+        return None
+
+    logger.info(f"Проверяем сообщение {payload.id}: {payload.date}")
+
+    message_hash = text_hash(message_text)
+
+    # 3. Проверка по хэшу: корзина и вакансии одним запросом,
+    # заведомо новые тексты отсекаются фильтром без БД
+    known = await check_known_hash(message_hash)
+    if known == "trash":
+        logger.info(f"Вакансия с хэшем {message_hash} находится в корзине, пропускаем.")
+        return None
+    if known == "vacancy":
+        logger.info(f"Вакансия с хэшем {message_hash} уже существует, пропускаем.")
+        return None
+    if processing_hashes.seen(message_hash):
+        logger.info(f"Вакансия с хэшем {message_hash} уже обрабатывается, пропускаем.")
+        return None
+
+    # 4. Конвертация текста: entities считаются от исходного текста (до strip)
+    entities = (payload.raw or {}).get("entities")
+    html_text = entities_to_html(payload.text or "", entities).strip()
+
+    job = VacancyJob(
+        message_text=message_text,
+        message_hash=message_hash,
+        html_text=html_text,
+        original_link=payload.link or get_message_link(payload),
+        payload=payload,
+        flag=payload.flag,
+        sender_name=payload.sender_name if not payload.sender_username else f"@{payload.sender_username}",
+        fwd_info=payload.fwd_from or "Нет",
+        sender_link=(
+            payload.sender_link
+            if payload.sender_link and "ссылка недоступна" not in payload.sender_link.lower()
+            else "Ссылка недоступна"
+        ),
+    )
 
-def markdown_to_html(text: str) -> str:
-    """Преобразует простой markdown-текст в HTML."""
-    text = re.sub(r"\*\*(.*?)\*\*", r"<b>\1</b>", text)
-    text = re.sub(r"_(.*?)_", r"<i>\1</i>", text)
-    return text
+    if payload.flag == "Технический специалист онлайн-школ":
+        # Сообщения из админчата не классифицируем
+        job.proffs = {payload.flag: 3.0}
+        return job
+
+    # Почти-дубликат (репост с другим эмодзи, ссылкой или переносом строки)
+    # получает решение оригинала без классификации и рассылки
+    near_duplicate = near_duplicate_index.find(message_text)
+    if near_duplicate:
+        logger.info(
+            f"Сообщение {payload.id} — почти-дубликат {near_duplicate.key} "
+            f"({near_duplicate.decision}, сходство {near_duplicate.similarity:.2f}), пропускаем."
+        )
+        if near_duplicate.decision == "trash":
+            await save_in_trash(html_text, message_hash)
+        return None
+    return job
 
 
-def message_to_html(text: str, entities: Optional[list] = None) -> str:
-    """Добавляет HTML-разметку на основе entities (жирный, курсив, ссылки и т.д.)."""
-    if not entities:
-        return text
+async def classify_job(job: VacancyJob) -> VacancyJob | None:
+    """Стадии фильтров и эмбеддинга: стоп-слова, спам, рейтинг профессий."""
+    if job.proffs:
+        return job
 
-    html = text
-    # Обрабатываем с конца, чтобы не ломать индексы
-    entities = sorted(entities, key=lambda e: e["offset"] + e["length"], reverse=True)
+    found_proffs = await find_job_func(
+        vacancy_text=job.message_text, text_hash=job.message_hash
+    )
+    if not found_proffs:
+        logger.info(f"⚠️ Вакансия не подходит ни под одну из профессий: {job.label}")
+        await save_in_trash(job.html_text, job.message_hash)
+        return None
+    job.found_proffs = found_proffs
+    return job
+
+
+async def verify_job(job: VacancyJob) -> VacancyJob | None:
+    """Стадия LLM: границы оценки, кэш решений, локальная модель, DeepSeek."""
+    if job.proffs:
+        return job
+
+    found_proffs = job.found_proffs
+    # Однозначные оценки решаются границами профессии без DeepSeek
+    verdicts, candidates = gating_policy.split(found_proffs)
+
+    # Решения по уже встречавшимся парам текст/профессия берём из кэша,
+    # в DeepSeek уходят только остальные
+    verdict_key = normalized_text_hash(job.message_text)
+    if candidates:
+        verdicts.update(await verdict_cache.get_many(verdict_key, candidates))
+    missing = [prof_name for prof_name in candidates if prof_name not in verdicts]
+    if missing:
+        # Уверенные случаи решает локальная модель, обученная на ответах DeepSeek
+        embedding, features = await profession_features(job.message_text, missing, job.message_hash)
+        verdicts.update(distilled_classifier.decide_many(embedding, features))
+        missing = [prof_name for prof_name in missing if prof_name not in verdicts]
+    if missing:
+        fresh = await ai_proff_check_batch(job.html_text, missing)
+        await verdict_cache.put_many(verdict_key, fresh)
+        await log_training_samples(verdict_key, embedding, features, fresh)
+        verdicts.update(fresh)
+
+    text = ""
+    for prof_name, score in found_proffs:
+        res = verdicts.get(prof_name, "0")
+        text += f"{prof_name} : {res}\n"
+        if res == "1":
+            job.proffs[prof_name] = score
+        else:
+            logger.info(f"Отсутствует пара профессия/вакансия: {job.label}")
 
-    for ent in entities:
-        start, end = ent["offset"], ent["offset"] + ent["length"]
-        entity_text = html[start:end]
-        entity_type = ent.get("_") or ent.get("type")  # поддержка обоих форматов
+    text += job.html_text
+    await send_message(-4822276897, text)
+    if not job.proffs:
+        logger.info(f"⚠️ Вакансия не подходит ни под одну из профессий: {job.label}")
+        await save_in_trash(job.html_text, job.message_hash)
+        return None
+    return job
 
-        match entity_type:
-            case "MessageEntityBold" | "bold":
-                html = html[:start] + f"<b>{entity_text}</b>" + html[end:]
-            case "MessageEntityItalic" | "italic":
-                html = html[:start] + f"<i>{entity_text}</i>" + html[end:]
-            case "MessageEntityUnderline" | "underline":
-                html = html[:start] + f"<u>{entity_text}</u>" + html[end:]
-            case "MessageEntityStrike" | "strikethrough":
-                html = html[:start] + f"<s>{entity_text}</s>" + html[end:]
-            case "MessageEntityCode" | "code":
-                html = html[:start] + f"<code>{entity_text}</code>" + html[end:]
-            case "MessageEntityPre" | "pre":
-                html = html[:start] + f"<pre>{entity_text}</pre>" + html[end:]
-            case "MessageEntityTextUrl" | "text_link":
-                url = ent.get("url", "#")
-                html = html[:start] + f'<a href="{url}">{entity_text}</a>' + html[end:]
-            case "MessageEntityUrl" | "url":
-                # если это просто ссылка без отдельного "url" в entity
-                html = html[:start] + f'<a href="{entity_text}">{entity_text}</a>' + html[end:]
-            case "MessageEntityMention" | "mention":
-                html = html[:start] + f'<a href="https://t.me/{entity_text[1:]}">{entity_text}</a>' + html[end:]
 
-    return html
+async def forward_job(job: VacancyJob) -> None:
+    """Форвард исходного сообщения в канал вакансий (один раз)."""
+    # 6. Форвард в канал по chat_id/id из payload, без повторного get_messages
+    job.link = await forwarder.forward(job.payload.chat_id, job.payload.id)
+    if job.link:
+        logger.info(f"Вакансия переслана в канал: {job.link}")
 
 
-
-async def process_message(payload: MessagePayload | None = None, hh_message: str | None = None, flag: str | None = None):
-    if flag == None:
-        # 1. Проверка дублей сообщений
-        if payload.id in processed_messages:
-            logger.info(f"Сообщение {payload.id} уже обработано, пропускаем.")
-            return
-        processed_messages.add(payload.id)
-
-        # 2. Собираем текст
-        message_text = (payload.text or "").strip()
-        if not message_text:
-            logger.info(f"Сообщение {payload.id} пустое, пропускаем.")
-            return
-
-        logger.info(f"Проверяем сообщение {payload.id}: {payload.date}")
-
-        original_link = payload.link or get_message_link(payload)
-
-        message_hash = hashlib.sha256(message_text.encode("utf-8")).hexdigest()
-        
-        if await is_in_trash(message_hash):
-            logger.info(f"Вакансия с хэшем {message_hash} находится в корзине, пропускаем.")
-            return
-
-
-        # 3. Проверка по хэшу в БД
-        existing = await get_vacancy_by_hash(message_hash)
-        if existing:
-            logger.info(
-                f"Вакансия с хэшем {message_hash} уже существует (ID {existing.id}), пропускаем."
-            )
-            return
-
-        # 4. Конвертация текста
-        markdown_text = markdown_to_html(message_text)
-        html_text = message_to_html(markdown_text, getattr(payload, "entities", None))
-
-        if payload.flag == "Технический специалист онлайн-школ":
-            found_proffs = [(payload.flag, 3.0)]
-            unique_proffs = {prof_name: score for prof_name, score in found_proffs}
-        else:
-            found_proffs = await find_job_func(vacancy_text=message_text)
-            if not found_proffs:
-                logger.info(f"⚠️ Вакансия не подходит ни под одну из профессий: {payload.id}")
-                await save_in_trash(html_text, message_hash)
-                return
-
-            unique_proffs = {prof_name: score for prof_name, score in found_proffs}
-            
-            filtered_proffs = []
-            text = ""
-            for prof_name, score in found_proffs:
-                res = await ai_proff_check(html_text, prof_name)
-                text += f"{prof_name} : {res}\n"
-                if res == "1":
-                    filtered_proffs.append((prof_name, score))
-                else:
-                    logger.info(f"Отсутствует пара профессия/вакансия: {payload.id}")
-
-        # создаём словарь из валидных профессий
-        unique_proffs = {prof_name: score for prof_name, score in filtered_proffs}
-        text += html_text
-        await send_message(-4822276897, text)
-        if not unique_proffs:
-            logger.info(f"⚠️ Вакансия не подходит ни под одну из профессий: {payload.id}")
-            await save_in_trash(html_text, message_hash)
-            return
-
-        try:
-            entity = await app.get_input_entity(payload.chat_id)
-            messages = await app.get_messages(entity, ids=[payload.id])
-            message = messages[0] if messages else None
-        except Exception as e:
-            logger.error(f"Ошибка получения сообщения для форварда: {e}")
-            message = None
-        
-        
-        link = None
-        if message:    
-        # 6. Форвард в канал (один раз)
-            try:
-                forwarded_msg = await app.forward_messages(
-                    entity=config.bot.wacancy_chat_id,
-                    messages=message.id,
-                    from_peer=message.chat_id,
-                )
-                chat_id = forwarded_msg.chat_id
-                msg_id = forwarded_msg.id
-                link = f"https://t.me/c/{str(chat_id)[4:]}/{msg_id}"
-                logger.info(f"Вакансия переслана в канал: {link}")
-            except Exception as e:
-                logger.error(f"Ошибка пересылки вакансии: {e}")
-        sender_name = payload.sender_name if not payload.sender_username else f"@{payload.sender_username}",
-        fwd_info = payload.fwd_from or "Нет",
-        sender_link = (
-                    payload.sender_link
-                    if payload.sender_link and "ссылка недоступна" not in payload.sender_link.lower()
-                    else "Ссылка недоступна"
-                )
-    else:       
-        message_text = hh_message
-        if not message_text:
-            logger.info(f"Сообщение пустое, пропускаем.")
-            return
-
-        logger.info(f"Проверяем сообщение c HH с флагом {flag}")
-
-        message_hash = hashlib.sha256(message_text.encode("utf-8")).hexdigest()
-        
-        if await is_in_trash(message_hash):
-            logger.info(f"HH Вакансия с хэшем {message_hash} находится в корзине, пропускаем.")
-            return
-        
-        existing = await get_vacancy_by_hash(message_hash)  # нужно реализовать
-        if existing:
-            logger.info(
-                f"HH Вакансия с хэшем {message_hash} уже существует (flag {flag}), пропускаем."
-            )
-            return
-        
-        found_proffs = [(flag, 3.0)]
-        unique_proffs = {prof_name: score for prof_name, score in found_proffs}
-        html_text = message_text
-        original_link = "Вакансия с hh.ru"
-        link = "Вакансия с hh.ru"
-        sender_name = "Вакансия с hh.ru"
-        fwd_info = "Вакансия с hh.ru"
-        sender_link = "Вакансия с hh.ru"
-        
+async def publish_job(job: VacancyJob) -> None:
+    """Стадии сохранения и рассылки: форвард, БД, пользователи, админка."""
+    if job.payload is not None:
+        await forward_job(job)
 
     for_admin_prof = {}
     # 7. Сохраняем для каждой профессии
-    for prof_name, score in unique_proffs.items():
+    for prof_name, score in job.proffs.items():
         vacancy_id = await save_vacancy_hash(
-            text=html_text,
+            text=job.html_text,
             proffname=prof_name,
             score=score,
-            url=original_link,
-            text_hash=message_hash,
-            vacancy_source=sender_name,
-            forwarding_source=fwd_info,
+            url=job.original_link,
+            text_hash=job.message_hash,
+            vacancy_source=job.sender_name,
+            forwarding_source=job.fwd_info,
         )
         if vacancy_id:
             for_admin_prof[prof_name] = vacancy_id
@@ -252,27 +259,28 @@ async def process_message(payload: MessagePayload | None = None, hh_message: str
             await send_vacancy_to_users(vacancy_id)
         else:
             logger.info(f"Вакансия по '{prof_name}' уже существует в БД, пропускаем.")
-        #await asyncio.sleep(0.5)
-        # 8. Отправляем в админку
-    if for_admin_prof:
-        reply = await bot.send_message(
-            config.bot.chat_id,
-            text=LEXICON_PARSER["vacancy_data"].format(
-                profession_name=', '.join(for_admin_prof.keys()),
-                vacancy_id=vacancy_id,
-                score=score,
-                orig_vacancy_link=original_link,
-                source=sender_name,
-                vacancy_link=link if link else "Закрытый чат",
-                fwd_info=fwd_info,
-                vacancy_text=html_text,
-                sender_link = sender_link
-            ),
-            parse_mode="HTML",
-            disable_web_page_preview=True,
-            reply_markup=await get_delete_vacancy_kb(vacancy_id),
-        )
-        await record_vacancy_sent(user_id=config.bot.chat_id, vacancy_id=vacancy_id, message_id=reply.message_id)
+
+    # 8. Отправляем в админку
+    if not for_admin_prof:
+        return
+    reply = await bot.send_message(
+        config.bot.chat_id,
+        text=LEXICON_PARSER["vacancy_data"].format(
+            profession_name=', '.join(for_admin_prof.keys()),
+            vacancy_id=vacancy_id,
+            score=score,
+            orig_vacancy_link=job.original_link,
+            source=job.sender_name,
+            vacancy_link=job.link if job.link else "Закрытый чат",
+            fwd_info=job.fwd_info,
+            vacancy_text=job.html_text,
+            sender_link=job.sender_link,
+        ),
+        parse_mode="HTML",
+        disable_web_page_preview=True,
+        reply_markup=await get_delete_vacancy_kb(vacancy_id),
+    )
+    await record_vacancy_sent(user_id=config.bot.chat_id, vacancy_id=vacancy_id, message_id=reply.message_id)
 
     try:
         for prof_name, vacancy_id in for_admin_prof.items():
@@ -280,11 +288,56 @@ async def process_message(payload: MessagePayload | None = None, hh_message: str
     except Exception as e:
         logger.error(f"Ошибка обновления URL вакансии: {e}")
 
-    await asyncio.sleep(
-        random.uniform(config.parser.delay_min, config.parser.delay_max)
+
+async def prepare_hh_message(hh_message: str | None, flag: str) -> VacancyJob | None:
+    """Вакансии HH уже привязаны к профессии поиска: только проверка по хэшу."""
+    message_text = hh_message
+    if not message_text:
+        logger.info(f"Сообщение пустое, пропускаем.")
+        return None
+
+    logger.info(f"Проверяем сообщение c HH с флагом {flag}")
+
+    message_hash = text_hash(message_text)
+
+    known = await check_known_hash(message_hash)
+    if known == "trash":
+        logger.info(f"HH Вакансия с хэшем {message_hash} находится в корзине, пропускаем.")
+        return None
+    if known == "vacancy":
+        logger.info(
+            f"HH Вакансия с хэшем {message_hash} уже существует (flag {flag}), пропускаем."
+        )
+        return None
+
+    return VacancyJob(
+        message_text=message_text,
+        message_hash=message_hash,
+        html_text=message_text,
+        original_link="Вакансия с hh.ru",
+        flag=flag,
+        proffs={flag: 3.0},
+        link="Вакансия с hh.ru",
+        sender_name="Вакансия с hh.ru",
+        fwd_info="Вакансия с hh.ru",
+        sender_link="Вакансия с hh.ru",
     )
 
 
+async def process_message(payload: MessagePayload | None = None, hh_message: str | None = None, flag: str | None = None):
+    """Все стадии подряд для одного сообщения (воркеры запускают их конвейером)."""
+    if flag is None:
+        job = await prepare_tg_message(payload)
+        for stage in (classify_job, verify_job):
+            if job is None:
+                return
+            job = await stage(job)
+    else:
+        job = await prepare_hh_message(hh_message, flag)
+    if job is not None:
+        await publish_job(job)
+
+
 
 @app.on(events.NewMessage())
 async def on_new_message(event):
@@ -292,16 +345,6 @@ async def on_new_message(event):
     if event.out or event.chat_id in EXCLUDED_CHAT_IDS:
         return
 
-    try:
-        sender = await event.get_sender()
-    except Exception as e:
-        logger.warning(f"⚠️ Не удалось получить отправителя: {e}")
-        sender = None
-
-    # Пропускаем сообщения от ботов
-    if isinstance(sender, User) and sender.bot and sender.id != 6069404137:
-        return
-
     # Пропускаем системные сообщения
     if event.message.action:
         logger.debug("🟡 Системное сообщение — пропускаем")
@@ -312,6 +355,24 @@ async def on_new_message(event):
     if flag:
         logger.info(f"🔵 Сообщение из админчата, устанавливаем флаг: {flag}")
 
+    # Дешёвый отсев до сериализации: очевидный мусор не попадает в очередь
+    reason = await ingest_filter.drop_reason(
+        event.chat_id, await get_full_text(event.message), classify=flag is None
+    )
+    if reason:
+        logger.debug(f"🧹 Сообщение {event.message.id} отброшено предфильтром: {reason}")
+        return
+
+    try:
+        sender = await entity_cache.get_sender(event.message)
+    except Exception as e:
+        logger.warning(f"⚠️ Не удалось получить отправителя: {e}")
+        sender = None
+
+    # Пропускаем сообщения от ботов
+    if isinstance(sender, User) and sender.bot and sender.id != 6069404137:
+        return
+
     # Подключаемся к NATS
     try:
         nc, js = await get_nats_connection()
@@ -329,12 +390,17 @@ async def on_new_message(event):
 
     # --- ✅ Публикация в NATS ---
     try:
-        await js.publish("vacancy.queue", json_data.encode())
-        logger.info(f"📨 Задача добавлена в очередь (сообщение {payload.id})")
+        ack = await js.publish(
+            "vacancy.queue",
+            json_data.encode(),
+            headers={"Nats-Msg-Id": vacancy_msg_id(event.chat_id, payload.id)},
+        )
+        if ack.duplicate:
+            logger.info(f"🔁 Сообщение {payload.id} уже в очереди, дубликат отброшен")
+        else:
+            logger.info(f"📨 Задача добавлена в очередь (сообщение {payload.id})")
     except Exception as e:
         logger.error(f"❌ Ошибка публикации задачи в NATS: {e}")
-        
-    await asyncio.sleep(0.5)  # Небольшая пауза между задачами
 
 
 
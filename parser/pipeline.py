@@ -0,0 +1,126 @@
+# pipeline.py
+"""
+Конвейер обработки сообщений JetStream.
+
+Сообщение проходит стадии по очереди; у каждой стадии своя степень
+параллельности, между стадиями — ограниченные очереди. Пока одно
+сообщение ждёт DeepSeek, другие уже считают эмбеддинги или сохраняются.
+
+Обработчик стадии получает результат предыдущей и возвращает значение
+для следующей; None — сообщение отброшено (ack), исключение — nak.
+После последней стадии сообщение подтверждается.
+"""
+import asyncio
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Stage:
+    name: str
+    handler: Callable[[Any], Awaitable[Any]]
+    concurrency: int = 1
+
+
+class Pipeline:
+    def __init__(
+        self,
+        name: str,
+        stages: list[Stage],
+        max_in_flight: int = 64,
+        heartbeat_seconds: float = 10,
+        on_error: Callable[[Any, Exception], Awaitable[None]] | None = None,
+    ) -> None:
+        self.name = name
+        self.stages = stages
+        self.heartbeat_seconds = heartbeat_seconds
+        self.on_error = on_error
+        self.max_in_flight = max_in_flight
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._queues = [asyncio.Queue(maxsize=max_in_flight) for _ in stages]
+        self._in_flight: set = set()
+        self._tasks: list[asyncio.Task] = []
+        self.counters: Counter[tuple[str, str]] = Counter()
+
+    def start(self) -> None:
+        for index, stage in enumerate(self.stages):
+            for _ in range(max(1, stage.concurrency)):
+                self._tasks.append(asyncio.create_task(self._run_stage(index)))
+        self._tasks.append(asyncio.create_task(self._heartbeat()))
+        logger.info(
+            f"🧵 Конвейер {self.name} запущен: "
+            + ", ".join(f"{stage.name}×{stage.concurrency}" for stage in self.stages)
+        )
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def submit(self, msg, value: Any) -> None:
+        """Кладёт сообщение в первую стадию; ждёт, если конвейер заполнен."""
+        await self._slots.acquire()
+        self._in_flight.add(msg)
+        await self._queues[0].put((msg, value))
+
+    @property
+    def free_slots(self) -> int:
+        """Сколько сообщений можно забрать из NATS, не дожидаясь места."""
+        return max(0, self.max_in_flight - len(self._in_flight))
+
+    async def _run_stage(self, index: int) -> None:
+        stage = self.stages[index]
+        queue = self._queues[index]
+        last = index == len(self.stages) - 1
+        while True:
+            msg, value = await queue.get()
+            try:
+                result = await stage.handler(value)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.counters[(stage.name, "failed")] += 1
+                logger.error(f"❌ Ошибка стадии {stage.name} ({self.name}): {e}")
+                await self._finish(msg, ok=False, error=e)
+                continue
+
+            if result is None or last:
+                self.counters[(stage.name, "done" if last and result is not None else "dropped")] += 1
+                await self._finish(msg, ok=True)
+            else:
+                self.counters[(stage.name, "passed")] += 1
+                await self._queues[index + 1].put((msg, result))
+
+    async def _finish(self, msg, ok: bool, error: Exception | None = None) -> None:
+        self._in_flight.discard(msg)
+        self._slots.release()
+        try:
+            if ok:
+                await msg.ack()
+            else:
+                if self.on_error is not None:
+                    await self.on_error(msg, error)
+                await msg.nak()
+        except Exception as e:
+            logger.error(f"❌ Не удалось {'подтвердить' if ok else 'вернуть'} сообщение ({self.name}): {e}")
+
+    async def _heartbeat(self) -> None:
+        """Продлевает ack_wait сообщениям, которые ещё в работе."""
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            for msg in list(self._in_flight):
+                try:
+                    await msg.in_progress()
+                except Exception as e:
+                    logger.warning(f"⚠️ in_progress не отправлен ({self.name}): {e}")
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "in_flight": len(self._in_flight),
+            **{f"{stage}_{kind}": count for (stage, kind), count in sorted(self.counters.items())},
+        }
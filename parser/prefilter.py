@@ -0,0 +1,99 @@
+# prefilter.py
+"""
+Предфильтр юзербота: дешёвые проверки до сериализации и публикации в NATS.
+
+Раньше в vacancy.queue уходило всё, что не от бота и не системное, —
+болтовня, короткие ответы, подписи к стикерам сохранялись в JetStream
+и отсеивались только воркером. Теперь в процессе Telethon по порядку:
+
+- chat:     список чатов из БД (allow — читаем только их, deny — пропускаем);
+- length:   пустой текст или короче PREFILTER_MIN_LENGTH (по умолчанию
+            отсекаются только пустые — короткие вакансии бывают настоящими);
+- stopword: скомпилированный шаблон стоп-слов;
+- known:    текст уже есть среди вакансий или в корзине (фильтр хэшей,
+            при возможном совпадении — проверка в БД, ложных отсевов нет).
+
+Счётчики отброшенных сообщений ведутся по причинам.
+"""
+import hashlib
+import logging
+from collections import Counter
+
+from config.config import load_config
+from db.requests import check_known_hash, get_chat_filters, load_stopwords
+from find_job_process.stopword_matcher import stopword_matcher
+
+config = load_config()
+logger = logging.getLogger(__name__)
+
+CHAT = "chat"
+LENGTH = "length"
+STOPWORD = "stopword"
+KNOWN = "known"
+
+
+class IngestFilter:
+    def __init__(self, min_length: int, check_stopwords: bool, check_hashes: bool) -> None:
+        self.min_length = min_length
+        self.check_stopwords = check_stopwords
+        self.check_hashes = check_hashes
+        self.allowed: frozenset[int] = frozenset()
+        self.denied: frozenset[int] = frozenset()
+        self.passed = 0
+        self.dropped: Counter[str] = Counter()
+
+    async def load(self) -> None:
+        filters = await get_chat_filters()
+        self.allowed = frozenset(chat_id for chat_id, mode in filters.items() if mode == "allow")
+        self.denied = frozenset(chat_id for chat_id, mode in filters.items() if mode == "deny")
+        logger.info(
+            f"🧹 Списки чатов предфильтра загружены: "
+            f"разрешено {len(self.allowed)}, запрещено {len(self.denied)}"
+        )
+
+    def chat_allowed(self, chat_id: int) -> bool:
+        if chat_id in self.denied:
+            return False
+        return not self.allowed or chat_id in self.allowed
+
+    async def drop_reason(self, chat_id: int, text: str, classify: bool = True) -> str | None:
+        """
+        Причина отсева или None, если сообщение идёт в очередь.
+        classify=False — сообщение не классифицируется (админчат):
+        проверяются только список чатов и известные тексты.
+        """
+        reason = await self._reason(chat_id, (text or "").strip(), classify)
+        if reason is None:
+            self.passed += 1
+        else:
+            self.dropped[reason] += 1
+        return reason
+
+    async def _reason(self, chat_id: int, text: str, classify: bool) -> str | None:
+        if not self.chat_allowed(chat_id):
+            return CHAT
+        if classify and len(text) < max(1, self.min_length):
+            return LENGTH
+        if classify and self.check_stopwords:
+            if stopword_matcher.is_stale:
+                await load_stopwords()
+            if stopword_matcher.find(text):
+                return STOPWORD
+        if self.check_hashes:
+            text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+            if await check_known_hash(text_hash):
+                return KNOWN
+        return None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "passed": self.passed,
+            **{reason: self.dropped[reason] for reason in (CHAT, LENGTH, STOPWORD, KNOWN)},
+        }
+
+
+ingest_filter = IngestFilter(
+    min_length=config.parser.prefilter_min_length,
+    check_stopwords=config.parser.prefilter_stopwords,
+    check_hashes=config.parser.prefilter_hashes,
+)
@@ -0,0 +1,100 @@
+# rate_governor.py
+"""
+Ограничение исходящих запросов юзербота.
+
+Вместо общей случайной паузы после каждого сообщения лимиты стоят только
+на действиях, которые реально идут в Telegram: forward, get_messages,
+get_entity. У каждого действия свой token bucket; отброшенные дубликаты
+и корзина проходят конвейер без задержек.
+
+FloodWaitError обрабатывается адаптивно: действие блокируется на указанное
+Telegram время, его скорость снижается вдвое и после успешных запросов
+постепенно возвращается к базовой. Ожидание дольше flood_max_wait
+не пережидаем — ошибка уходит вызывающему коду.
+
+Короткие FloodWait (до flood_sleep_threshold клиента) Telethon по-прежнему
+пережидает сам — настройка клиента общая, от неё зависит и получение
+апдейтов, поэтому здесь видны только ожидания длиннее порога.
+"""
+import asyncio
+import logging
+import time
+from collections import Counter
+
+from telethon.errors import FloodWaitError
+
+from config.config import load_config
+from utils.token_bucket import TokenBucket
+
+config = load_config()
+logger = logging.getLogger(__name__)
+
+MIN_RATE_FACTOR = 0.1  # ниже 10% базовой скорости после FloodWait не опускаемся
+RECOVERY_FACTOR = 1.05  # рост скорости после каждого успешного запроса
+
+
+class RateGovernor:
+    def __init__(self, rates: dict[str, float], flood_max_wait: float) -> None:
+        self.base_rates = dict(rates)
+        self.flood_max_wait = flood_max_wait
+        self.buckets = {
+            action: TokenBucket(rate, max(1.0, rate)) for action, rate in rates.items()
+        }
+        self._blocked_until: dict[str, float] = {}
+        self.calls: Counter[str] = Counter()
+        self.flood_waits: Counter[str] = Counter()
+
+    async def call(self, action: str, func, *args, **kwargs):
+        """Выполняет запрос Telegram с лимитом действия и обработкой FloodWait."""
+        bucket = self.buckets[action]
+        while True:
+            delay = self._blocked_until.get(action, 0) - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await bucket.acquire()
+            self.calls[action] += 1
+            try:
+                result = await func(*args, **kwargs)
+            except FloodWaitError as e:
+                self._on_flood_wait(action, e.seconds)
+                if e.seconds > self.flood_max_wait:
+                    raise
+                continue
+            self._recover(action)
+            return result
+
+    def _on_flood_wait(self, action: str, seconds: int) -> None:
+        self.flood_waits[action] += 1
+        self._blocked_until[action] = max(
+            self._blocked_until.get(action, 0), time.monotonic() + seconds
+        )
+        bucket = self.buckets[action]
+        bucket.rate = max(self.base_rates[action] * MIN_RATE_FACTOR, bucket.rate / 2)
+        logger.warning(
+            f"⚠️ FloodWait {seconds} с на {action}, скорость снижена до {bucket.rate:.2f}/с"
+        )
+
+    def _recover(self, action: str) -> None:
+        bucket = self.buckets[action]
+        if bucket.rate < self.base_rates[action]:
+            bucket.rate = min(self.base_rates[action], bucket.rate * RECOVERY_FACTOR)
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        return {
+            action: {
+                "rate": round(bucket.rate, 2),
+                "calls": self.calls[action],
+                "flood_waits": self.flood_waits[action],
+            }
+            for action, bucket in self.buckets.items()
+        }
+
+
+rate_governor = RateGovernor(
+    rates={
+        "forward": config.parser.forward_rps,
+        "get_messages": config.parser.get_messages_rps,
+        "get_entity": config.parser.get_entity_rps,
+    },
+    flood_max_wait=config.parser.flood_max_wait,
+)
@@ -1,38 +1,76 @@
-import json
 import logging
 import asyncio
-from parser.parser_bot import process_message
-from parser.telethon_client import app
-from telethon.errors import MessageIdInvalidError
+from config.config import load_config
+from parser.parser_bot import (
+    prepare_tg_message,
+    classify_job,
+    verify_job,
+    publish_job,
+    processed_messages,
+    processing_hashes,
+    vacancy_msg_id,
+    text_hash,
+)
+from parser.pipeline import Pipeline, Stage
 from schemas.message_payload import MessagePayload
 
-MAX_RETRIES = 3  # Максимальное количество попыток для одной задачи
+config = load_config()
 logger = logging.getLogger(__name__)
 
+
+async def decode_message(data: bytes):
+    # --- ✅ Декодируем и валидируем payload ---
+    payload = MessagePayload.model_validate_json(data.decode())
+    logger.info(f"📥 Получена задача на обработку сообщения {payload.id} из чата {payload.chat_id}")
+    return await prepare_tg_message(payload)
+
+
+async def publish_message(job):
+    await publish_job(job)
+    logger.info(f"✅ Задача успешно выполнена: message_id={job.payload.id}")
+    return job
+
+
+async def on_vacancy_error(msg, error: Exception) -> None:
+    # повторная доставка после nak не должна отсеяться как дубликат
+    try:
+        payload = MessagePayload.model_validate_json(msg.data.decode())
+    except Exception:
+        return
+    processed_messages.discard(vacancy_msg_id(payload.chat_id, payload.id))
+    processing_hashes.discard(text_hash((payload.text or "").strip()))
+
+
+vacancy_pipeline = Pipeline(
+    "vacancy.queue",
+    stages=[
+        Stage("decode", decode_message, config.pipeline.decode_concurrency),
+        Stage("classify", classify_job, config.pipeline.classify_concurrency),
+        Stage("llm", verify_job, config.pipeline.llm_concurrency),
+        Stage("publish", publish_message, config.pipeline.publish_concurrency),
+    ],
+    max_in_flight=config.pipeline.max_in_flight,
+    heartbeat_seconds=config.pipeline.heartbeat_seconds,
+    on_error=on_vacancy_error,
+)
+
+
 async def vacancy_worker(js):
     sub = await js.pull_subscribe("vacancy.queue", durable="vacancy_worker")
+    vacancy_pipeline.start()
     logger.info("🚀 Воркер запущен и слушает очередь 'vacancy.queue'")
 
     while True:
+        # берём из NATS не больше, чем конвейер примет сразу: сообщения,
+        # ждущие места, не получали бы in_progress и истекали по ack_wait
+        batch = min(config.pipeline.fetch_batch, vacancy_pipeline.free_slots)
+        if batch == 0:
+            await asyncio.sleep(0.1)
+            continue
         try:
-            msgs = await sub.fetch(1, timeout=5)
+            msgs = await sub.fetch(batch, timeout=5)
         except Exception:
             continue  # ничего нет, ждём дальше
 
         for msg in msgs:
-            try:
-                # --- ✅ Декодируем и валидируем payload ---
-                payload = MessagePayload.model_validate_json(msg.data.decode())
-                logger.info(f"📥 Получена задача на обработку сообщения {payload.id} из чата {payload.chat_id}")
-
-                # --- ✅ Обрабатываем сообщение напрямую ---
-                await process_message(payload=payload)
-
-                # --- ✅ Подтверждаем задачу ---
-                await msg.ack()
-                logger.info(f"✅ Задача успешно выполнена: message_id={payload.id}")
-
-            except Exception as e:
-                logger.error(f"❌ Ошибка обработки задачи: {e}")
-                await msg.nak()
-        #await asyncio.sleep(0.5)  # Небольшая пауза между задачами
\ No newline at end of file
+            await vacancy_pipeline.submit(msg, msg.data)
@@ -3,6 +3,7 @@ import re
 from typing import Optional, Any
 from pydantic import BaseModel, Field
 from parser.extract_sender import extract_sender_info
+from parser.entity_cache import entity_cache
 from telethon.errors import TypeNotFoundError
 
 
@@ -72,7 +73,7 @@ class MessagePayload(BaseModel):
 
         # Безопасное получение отправителя
         try:
-            sender = await message.get_sender()
+            sender = await entity_cache.get_sender(message)
             sender_name = getattr(sender, "first_name", None)
             sender_username = getattr(sender, "username", None)
             sender_id = getattr(sender, "id", None)
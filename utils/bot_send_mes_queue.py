@@ -21,22 +21,12 @@ logger = logging.getLogger(__name__)
 
 semaphore = asyncio.Semaphore(1)
 
-import re
-from html import escape
+from utils.tg_html import sanitize_html
 
 
 def safe_html(text: str) -> str:
-    """Экранирует любые непарные или неизвестные HTML-теги."""
-    allowed_tags = ["b", "i", "u", "a", "code", "pre", "blockquote", "tg-spoiler"]
-
-    # заменяем любые угловые скобки, кроме разрешённых тегов
-    def repl(match):
-        tag = match.group(1)
-        if tag and any(tag.startswith(t) for t in allowed_tags):
-            return f"<{tag}>"
-        return escape(f"<{tag}>")
-
-    return re.sub(r"<(/?[^>]+)>", repl, text)
+    """Экранирует любые неизвестные HTML-теги и одиночные спецсимволы."""
+    return sanitize_html(text)
 
 
 async def bot_send_messages_worker(js):
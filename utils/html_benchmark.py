@@ -0,0 +1,87 @@
+# utils/html_benchmark.py
+"""
+Микробенчмарк entities → HTML: прежний message_to_html против entities_to_html.
+
+    python -m utils.html_benchmark
+    python -m utils.html_benchmark --entities 50 200 1000 --repeat 20
+
+Синтетический пост: длинный текст с эмодзи, жирными и курсивными
+фрагментами и ссылками каждые несколько слов.
+"""
+import argparse
+import random
+import re
+import time
+
+from utils.tg_html import entities_to_html
+
+WORDS = ["вакансия", "удалённо", "зарплата", "😀", "опыт", "проект", "команда", "🔥", "задачи"]
+
+
+def legacy_message_to_html(text: str, entities: list | None = None) -> str:
+    """Прежняя реализация из parser_bot (markdown + срезы на каждую entity)."""
+    text = re.sub(r"\*\*(.*?)\*\*", r"<b>\1</b>", text)
+    text = re.sub(r"_(.*?)_", r"<i>\1</i>", text)
+    if not entities:
+        return text
+
+    html = text
+    entities = sorted(entities, key=lambda e: e["offset"] + e["length"], reverse=True)
+    for ent in entities:
+        start, end = ent["offset"], ent["offset"] + ent["length"]
+        entity_text = html[start:end]
+        match ent.get("_"):
+            case "MessageEntityBold":
+                html = html[:start] + f"<b>{entity_text}</b>" + html[end:]
+            case "MessageEntityItalic":
+                html = html[:start] + f"<i>{entity_text}</i>" + html[end:]
+            case "MessageEntityTextUrl":
+                html = html[:start] + f'<a href="{ent.get("url", "#")}">{entity_text}</a>' + html[end:]
+    return html
+
+
+def make_post(entity_count: int, seed: int = 0) -> tuple[str, list[dict]]:
+    rng = random.Random(seed)
+    words = [rng.choice(WORDS) for _ in range(entity_count * 4)]
+    text = " ".join(words)
+
+    entities = []
+    offset = 0
+    for index, word in enumerate(words):
+        length = len(word.encode("utf-16-le")) // 2
+        if index % 4 == 0:
+            kind = rng.choice(["MessageEntityBold", "MessageEntityItalic", "MessageEntityTextUrl"])
+            entity = {"_": kind, "offset": offset, "length": length}
+            if kind == "MessageEntityTextUrl":
+                entity["url"] = f"https://example.com/{index}"
+            entities.append(entity)
+        offset += length + 1
+    return text, entities
+
+
+def timeit(func, text: str, entities: list[dict], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func(text, entities)
+    return (time.perf_counter() - started) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк рендера entities в HTML")
+    parser.add_argument("--entities", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'entities':>8} {'символов':>9} {'прежний, мс':>12} {'новый, мс':>10} {'ускорение':>10}")
+    for count in args.entities:
+        text, entities = make_post(count)
+        legacy = timeit(legacy_message_to_html, text, entities, args.repeat)
+        current = timeit(entities_to_html, text, entities, args.repeat)
+        print(
+            f"{count:>8} {len(text):>9} {legacy * 1000:>12.3f} "
+            f"{current * 1000:>10.3f} {legacy / current:>9.1f}×"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# utils/import_budget.py
+"""
+Проверка времени импорта точек входа через `python -X importtime`.
+
+    python -m utils.import_budget
+    python -m utils.import_budget --budget main=4 --budget bot.background_tasks.broker=1.5
+
+Каждый модуль импортируется в отдельном чистом интерпретаторе. Печатает
+общее время и самые медленные импорты; код выхода 1, если бюджет превышен.
+Запускать с тем же .env, что и сервисы (load_config читается при импорте).
+"""
+import argparse
+import subprocess
+import sys
+
+DEFAULT_BUDGETS = {
+    "main": 3.0,  # бот + парсер + классификатор (torch — только с его бэкендом)
+    "bot.background_tasks.broker": 2.0,  # taskiq-воркеры и планировщик
+}
+
+
+def measure(module: str) -> tuple[float, list[tuple[float, str]]]:
+    """
+    Возвращает (время импорта, [(собственное время, модуль)]) в секундах.
+    Импорты самого интерпретатора (site, encodings) не учитываются.
+    """
+    startup = {name for _, name in _importtime("pass")[1]}
+    total, own = _importtime(f"import {module}", skip=startup)
+    return total, own
+
+
+def _importtime(code: str, skip: set[str] = frozenset()) -> tuple[float, list[tuple[float, str]]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{code} упал:\n{result.stderr[-2000:]}")
+
+    total = 0.0
+    own = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if name.strip() in skip:
+            continue
+        own.append((int(self_us) / 1e6, name.strip()))
+        # модули верхнего уровня печатаются без отступа
+        if not name.startswith("  "):
+            total += int(cumulative_us) / 1e6
+    return total, own
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бюджет времени импорта точек входа")
+    parser.add_argument(
+        "--budget", action="append", default=[],
+        help="модуль=секунды, можно несколько раз",
+    )
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    budgets = dict(DEFAULT_BUDGETS)
+    for item in args.budget:
+        module, seconds = item.split("=", 1)
+        budgets[module] = float(seconds)
+
+    failed = False
+    for module, budget in budgets.items():
+        total, own = measure(module)
+        status = "✅" if total <= budget else "❌"
+        failed |= total > budget
+        print(f"{status} {module}: {total:.2f} с (бюджет {budget:.2f} с)")
+        for seconds, name in sorted(own, reverse=True)[: args.top]:
+            print(f"    {seconds * 1000:8.1f} мс  {name}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
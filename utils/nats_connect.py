@@ -2,6 +2,7 @@ import nats
 from nats.aio.client import Client
 from nats.js import JetStreamContext
 from nats.js.api import StreamConfig, RetentionPolicy
+from nats.js.errors import NotFoundError
 from logging import getLogger
 from config.config import load_config
 import asyncio
@@ -40,21 +41,36 @@ async def close_nats_connection():
         await _nc.close()
 
 
-async def setup_vacancy_stream(js):
-    # Проверим, существует ли уже поток
-    streams = await js.streams_info()
-    if any(stream.config.name == "VACANCY_TASKS" for stream in streams):
-        logger.info("✅ Stream VACANCY_TASKS уже существует")
+async def ensure_dedup_stream(js, name: str, subject: str, duplicate_window: int) -> None:
+    """
+    Создаёт поток-очередь с окном дедупликации по Nats-Msg-Id;
+    у уже существующего потока окно обновляется, если отличается.
+    """
+    stream_config = StreamConfig(
+        name=name,
+        subjects=[subject],
+        retention=RetentionPolicy.WORK_QUEUE,
+        duplicate_window=duplicate_window,
+    )
+    try:
+        info = await js.stream_info(name)
+    except NotFoundError:
+        await js.add_stream(stream_config)
+        logger.info(f"🚀 Stream {name} создан (окно дедупликации {duplicate_window} с)")
         return
 
-    await js.add_stream(
-        StreamConfig(
-            name="VACANCY_TASKS",
-            subjects=["vacancy.queue"],
-            retention=RetentionPolicy.WORK_QUEUE,
-        )
+    if info.config.duplicate_window != duplicate_window:
+        info.config.duplicate_window = duplicate_window
+        await js.update_stream(info.config)
+        logger.info(f"🔧 Stream {name}: окно дедупликации {duplicate_window} с")
+    else:
+        logger.info(f"✅ Stream {name} уже существует")
+
+
+async def setup_vacancy_stream(js):
+    await ensure_dedup_stream(
+        js, "VACANCY_TASKS", "vacancy.queue", config.nats.vacancy_dedup_window
     )
-    logger.info("🚀 Stream VACANCY_TASKS создан")
 
 
 async def setup_tasks_stream(js):
@@ -92,17 +108,6 @@ async def setup_bot_send_message_stream(js):
     
 
 async def setup_hh_vacancy_stream(js):
-    # Проверим, существует ли уже поток
-    streams = await js.streams_info()
-    if any(stream.config.name == "HH_VACANCY_TASKS" for stream in streams):
-        logger.info("✅ Stream HH_VACANCY_TASKS уже существует")
-        return
-
-    await js.add_stream(
-        StreamConfig(
-            name="HH_VACANCY_TASKS",
-            subjects=["hh.vacancy.queue"],
-            retention=RetentionPolicy.WORK_QUEUE,
-        )
+    await ensure_dedup_stream(
+        js, "HH_VACANCY_TASKS", "hh.vacancy.queue", config.nats.hh_dedup_window
     )
-    logger.info("🚀 Stream HH_VACANCY_TASKS создан")
\ No newline at end of file
@@ -0,0 +1,47 @@
+# utils/recent_keys.py
+import time
+from collections import OrderedDict
+
+
+class RecentKeys:
+    """
+    Ограниченное по размеру и времени множество недавно виденных ключей.
+    Память не растёт в долгоживущих процессах: старые ключи вытесняются
+    по LRU и истекают через ttl секунд.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 3600) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._keys: OrderedDict[str, float] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        expires_at = self._keys.get(key)
+        if expires_at is None:
+            return False
+        if expires_at < time.monotonic():
+            del self._keys[key]
+            return False
+        return True
+
+    def add(self, key: str) -> None:
+        now = time.monotonic()
+        self._keys[key] = now + self.ttl
+        self._keys.move_to_end(key)
+        while self._keys and (
+            len(self._keys) > self.max_size or next(iter(self._keys.values())) < now
+        ):
+            self._keys.popitem(last=False)
+
+    def seen(self, key: str) -> bool:
+        """True, если ключ уже встречался в окне; иначе запоминает его."""
+        if key in self:
+            return True
+        self.add(key)
+        return False
+
+    def discard(self, key: str) -> None:
+        self._keys.pop(key, None)
@@ -0,0 +1,152 @@
+# utils/tg_html.py
+"""
+Текст Telegram + entities → HTML для parse_mode="HTML".
+
+Один проход по границам entities: O(n + k log k) вместо пересборки строки
+на каждую entity. Смещения entities — в UTF-16 (как их отдаёт Telegram),
+поэтому эмодзи и прочие символы вне BMP не сдвигают разметку. Вложенные
+entities вкладываются тегами, пересекающиеся — закрываются и открываются
+заново на границе. Текст между тегами экранируется.
+"""
+import re
+from html import escape
+
+# тип entity (TL-конструктор или Bot API) → тег
+ENTITY_TAGS = {
+    "MessageEntityBold": "b",
+    "bold": "b",
+    "MessageEntityItalic": "i",
+    "italic": "i",
+    "MessageEntityUnderline": "u",
+    "underline": "u",
+    "MessageEntityStrike": "s",
+    "strikethrough": "s",
+    "MessageEntityCode": "code",
+    "code": "code",
+    "MessageEntityPre": "pre",
+    "pre": "pre",
+    "MessageEntitySpoiler": "tg-spoiler",
+    "spoiler": "tg-spoiler",
+    "MessageEntityBlockquote": "blockquote",
+    "blockquote": "blockquote",
+    "MessageEntityTextUrl": "a",
+    "text_link": "a",
+    "MessageEntityUrl": "a",
+    "url": "a",
+    "MessageEntityMention": "a",
+    "mention": "a",
+}
+
+# теги, которые понимает Telegram (всё остальное safe_html экранирует)
+ALLOWED_TAGS = {
+    "b", "strong", "i", "em", "u", "ins", "s", "strike", "del",
+    "a", "code", "pre", "blockquote", "tg-spoiler", "span", "tg-emoji",
+}
+
+
+def _link_tag(entity: dict, span_text: str) -> str:
+    entity_type = entity.get("_") or entity.get("type")
+    if entity_type in ("MessageEntityMention", "mention"):
+        url = f"https://t.me/{span_text[1:]}"
+    elif entity_type in ("MessageEntityUrl", "url"):
+        url = span_text  # ссылка без отдельного "url" в entity
+    else:
+        url = entity.get("url") or "#"
+    return f'<a href="{escape(url, quote=True)}">'
+
+
+def entities_to_html(text: str, entities: list[dict] | None = None) -> str:
+    """Экранированный HTML с разметкой по entities (смещения в UTF-16)."""
+    if not entities:
+        return escape(text, quote=False)
+
+    data = text.encode("utf-16-le")
+    units = len(data) // 2
+    if units == len(text):
+        # только BMP: UTF-16 смещения совпадают с индексами строки
+        def chunk(start: int, end: int) -> str:
+            return text[start:end]
+    else:
+        def chunk(start: int, end: int) -> str:
+            return data[2 * start : 2 * end].decode("utf-16-le", errors="replace")
+
+    spans = []
+    for entity in entities:
+        tag = ENTITY_TAGS.get(entity.get("_") or entity.get("type"))
+        start = max(0, int(entity.get("offset", 0)))
+        end = min(units, start + int(entity.get("length", 0)))
+        if tag and start < end:
+            spans.append((start, end, tag, entity))
+    if not spans:
+        return escape(text, quote=False)
+
+    # на одной границе длинные entities открываются первыми — они снаружи
+    spans.sort(key=lambda span: (span[0], -span[1]))
+    boundaries = sorted({0, units, *(span[0] for span in spans), *(span[1] for span in spans)})
+
+    parts: list[str] = []
+    append = parts.append
+    stack: list[tuple[int, str, str]] = []  # (end, тег, открывающий тег)
+    open_ends: dict[int, int] = {}  # end → сколько открытых entities на нём заканчивается
+    needs_escape = "<" in text or ">" in text or "&" in text
+    next_span = 0
+    span_count = len(spans)
+    previous = 0
+    for position in boundaries:
+        if position > previous:
+            segment = chunk(previous, position)
+            append(escape(segment, quote=False) if needs_escape else segment)
+            previous = position
+
+        # закрываем закончившиеся; если над ними есть незакончившиеся —
+        # закрываем и их, а потом открываем заново (пересечение entities)
+        if open_ends.get(position):
+            reopen = []
+            while open_ends[position]:
+                item = stack.pop()
+                append(f"</{item[1]}>")
+                if item[0] == position:
+                    open_ends[position] -= 1
+                else:
+                    reopen.append(item)
+            for item in reversed(reopen):
+                append(item[2])
+                stack.append(item)
+
+        while next_span < span_count and spans[next_span][0] == position:
+            start, end, tag, entity = spans[next_span]
+            opening = f"<{tag}>" if tag != "a" else _link_tag(entity, chunk(start, end))
+            append(opening)
+            stack.append((end, tag, opening))
+            open_ends[end] = open_ends.get(end, 0) + 1
+            next_span += 1
+
+    for item in reversed(stack):
+        append(f"</{item[1]}>")
+    return "".join(parts)
+
+
+_HTML_TOKEN_RE = re.compile(
+    r"<(/?)([a-zA-Z][a-zA-Z0-9-]*)(\s[^<>]*)?>"  # тег
+    r"|&(?:#\d+|#x[0-9a-fA-F]+|lt|gt|amp|quot);"  # уже экранированный символ
+    r"|[<>&]"  # одиночный спецсимвол
+)
+
+
+def sanitize_html(text: str) -> str:
+    """
+    Оставляет теги, которые понимает Telegram, и готовые HTML-сущности;
+    всё остальное (чужие теги, одиночные < > &) экранирует. Один проход.
+    """
+
+    def repl(match: re.Match) -> str:
+        name = match.group(2)
+        if name is not None:
+            if name.lower() in ALLOWED_TAGS:
+                return match.group(0)
+            return escape(match.group(0), quote=False)
+        if len(match.group(0)) > 1:
+            return match.group(0)
+        return escape(match.group(0), quote=False)
+
+    return _HTML_TOKEN_RE.sub(repl, text)
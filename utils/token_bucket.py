@@ -0,0 +1,42 @@
+# utils/token_bucket.py
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    Простой асинхронный token bucket: rate единиц в секунду, не больше capacity про запас.
+    Баланс может уйти в минус (когда фактический расход оказался больше оценки) —
+    тогда следующие запросы просто подождут дольше.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1) -> None:
+        if self.rate <= 0:
+            return
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+
+    def consume(self, amount: float) -> None:
+        """Списывает без ожидания (донастройка после фактического расхода)."""
+        if self.rate <= 0:
+            return
+        self._refill()
+        self._tokens -= amount